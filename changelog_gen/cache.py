@@ -0,0 +1,134 @@
+"""Persistent cache of parsed commit logs."""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import time
+import typing as t
+from pathlib import Path
+
+from changelog_gen.extractor import Change, Footer, Link
+from changelog_gen.util import timer
+
+if t.TYPE_CHECKING:
+    from changelog_gen.config import Config
+    from changelog_gen.vcs import BaseVcs
+
+# Increment when the serialised Change format changes to invalidate existing entries.
+CACHE_VERSION = 1
+
+
+def fingerprint(*parts: t.Any) -> str:  # noqa: ANN401
+    """Generate a stable hash of configuration affecting commit parsing."""
+    payload = json.dumps([CACHE_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _dump(conventional: bool, change: Change | None) -> str:  # noqa: FBT001
+    if change is not None:
+        # asdict is unable to copy defaultdict extractions on older pythons.
+        change = dataclasses.asdict(dataclasses.replace(change, extractions=dict(change.extractions)))
+    return json.dumps({"conventional": conventional, "change": change})
+
+
+def _load(value: str) -> tuple[bool, Change | None]:
+    data = json.loads(value)
+    change = data["change"]
+    if change is not None:
+        change["footers"] = [Footer(**footer) for footer in change["footers"]]
+        change["links"] = [Link(**link) for link in change["links"]]
+        change = Change(**change)
+    return data["conventional"], change
+
+
+class ChangeCache:
+    """SQLite backed cache of parsed changes, keyed by commit hash and config fingerprint.
+
+    Commits are immutable, so for a given configuration the parsed change for a
+    commit never changes. Least recently used entries are evicted once the
+    cache exceeds `max_entries`.
+    """
+
+    def __init__(self: t.Self, path: Path, fingerprint: str, max_entries: int = 10000) -> None:
+        self.path = path
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self._pending = {}
+        self._hits = []
+        self._db = None
+
+    @classmethod
+    def for_repo(cls: type[ChangeCache], git: BaseVcs, cfg: Config, *, include_all: bool = False) -> ChangeCache:
+        """Generate a cache stored in the repository git directory for the current configuration."""
+        key = fingerprint(
+            cfg.type_headers,
+            cfg.footer_parsers,
+            cfg.github,
+            cfg.extractors,
+            cfg.link_generators,
+            include_all,
+        )
+        return cls(git.git_dir / "changelog-gen" / "cache.sqlite", key, cfg.commit_cache_size)
+
+    @property
+    def db(self: t.Self) -> sqlite3.Connection:
+        """Lazily open the cache database."""
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path))
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS changes (
+                    commit_hash TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (commit_hash, fingerprint)
+                )""",
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS changes_last_used ON changes (last_used)")
+        return self._db
+
+    def get(self: t.Self, commit_hash: str) -> tuple[bool, Change | None] | None:
+        """Fetch a cached `(conventional, change)` result for a commit."""
+        row = self.db.execute(
+            "SELECT value FROM changes WHERE commit_hash = ? AND fingerprint = ?",
+            (commit_hash, self.fingerprint),
+        ).fetchone()
+        if row is None:
+            return None
+        self._hits.append(commit_hash)
+        return _load(row[0])
+
+    def put(self: t.Self, commit_hash: str, conventional: bool, change: Change | None) -> None:  # noqa: FBT001
+        """Store a parsed result, written on flush."""
+        self._pending[commit_hash] = _dump(conventional, change)
+
+    @timer
+    def flush(self: t.Self) -> None:
+        """Write pending entries, refresh recently used entries, and evict the least recently used."""
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO changes (commit_hash, fingerprint, value, last_used) VALUES (?, ?, ?, ?)",
+                [(commit_hash, self.fingerprint, value, now) for commit_hash, value in self._pending.items()],
+            )
+            self.db.executemany(
+                "UPDATE changes SET last_used = ? WHERE commit_hash = ? AND fingerprint = ?",
+                [(now, commit_hash, self.fingerprint) for commit_hash in self._hits],
+            )
+            self.db.execute(
+                "DELETE FROM changes WHERE rowid IN "
+                "(SELECT rowid FROM changes ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        self._pending.clear()
+        self._hits.clear()
+
+    def close(self: t.Self) -> None:
+        """Close the cache database."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
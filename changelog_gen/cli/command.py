@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import contextlib
 import importlib
-import importlib.metadata
 import platform
 import shlex
 import subprocess
@@ -11,11 +10,10 @@ from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import rtoml
 import typer
-from pygments import formatters, highlight, lexers
 
 from changelog_gen import (
     config,
@@ -26,13 +24,11 @@ from changelog_gen import (
 from changelog_gen.cli import util
 from changelog_gen.context import Context
 from changelog_gen.util import timer
-from changelog_gen.vcs import Git
 from changelog_gen.version import BumpVersion
 
-try:
-    from changelog_gen.post_processor import per_issue_post_process
-except ModuleNotFoundError:  # pragma: no cover
-    per_issue_post_process = None
+if TYPE_CHECKING:
+    from changelog_gen.cache import ChangeCache
+    from changelog_gen.vcs import BaseVcs
 
 tempfile_prefix = "_tmp_changelog"
 
@@ -40,6 +36,8 @@ tempfile_prefix = "_tmp_changelog"
 def _version_callback(*, value: bool) -> None:
     """Get current cli version."""
     if value:
+        import importlib.metadata
+
         version = importlib.metadata.version("changelog-gen")
         typer.echo(f"changelog {version}")
         raise typer.Exit
@@ -99,6 +97,8 @@ def display_config(
     ),
 ) -> None:
     """Display current configuration."""
+    from pygments import formatters, highlight, lexers
+
     cfg = config.read()
     output = cfg.to_dict()
     if key:
@@ -160,6 +160,7 @@ def gen(  # noqa: PLR0913
     ),
     *,
     dry_run: bool = typer.Option(False, "--dry-run", help="Don't write release notes, check for errors."),  # noqa: FBT003
+    diff: bool = typer.Option(False, "--diff", help="Display a diff of CHANGELOG changes, with --dry-run."),  # noqa: FBT003
     include_all: bool = typer.Option(
         False,  # noqa: FBT003
         "--include-all",
@@ -243,6 +244,7 @@ def gen(  # noqa: PLR0913
             version_part,
             version_tag,
             dry_run=dry_run,
+            diff=diff,
             interactive=interactive,
             include_all=include_all,
             yes=yes,
@@ -290,6 +292,17 @@ def create_with_editor(context: Context, content: str, extension: writer.Extensi
     return content
 
 
+def _commit_cache(git: BaseVcs, cfg: config.Config, *, include_all: bool = False) -> ChangeCache | None:
+    """Open the commit cache for the repository, if enabled."""
+    if not cfg.commit_cache:
+        return None
+
+    # Don't import sqlite3 unless the commit cache is enabled.
+    from changelog_gen.cache import ChangeCache
+
+    return ChangeCache.for_repo(git, cfg, include_all=include_all)
+
+
 @timer
 def _gen(  # noqa: PLR0913, C901, PLR0915
     context: Context,
@@ -297,13 +310,17 @@ def _gen(  # noqa: PLR0913, C901, PLR0915
     new_version: str | None = None,
     *,
     dry_run: bool = False,
+    diff: bool = False,
     interactive: bool = True,
     include_all: bool = False,
     yes: bool = False,
 ) -> None:
+    # Don't import GitPython until a repository is touched.
+    from changelog_gen.vcs import new_vcs
+
     cfg = context.config
-    bv = BumpVersion(cfg, new_version, dry_run=dry_run, allow_dirty=cfg.allow_dirty)
-    git = Git(context=context, dry_run=dry_run, commit=cfg.commit, release=cfg.release, tag=cfg.tag)
+    git = new_vcs(context, dry_run=dry_run, commit=cfg.commit, release=cfg.release, tag=cfg.tag)
+    bv = BumpVersion(cfg, new_version, dry_run=dry_run, allow_dirty=cfg.allow_dirty, git=git)
 
     extension = util.detect_extension()
 
@@ -313,7 +330,8 @@ def _gen(  # noqa: PLR0913, C901, PLR0915
 
     process_info(git.get_current_info(), context, dry_run=dry_run)
 
-    e = extractor.ChangeExtractor(context=context, git=git, dry_run=dry_run, include_all=include_all)
+    cache = _commit_cache(git, cfg, include_all=include_all)
+    e = extractor.ChangeExtractor(context=context, git=git, dry_run=dry_run, include_all=include_all, cache=cache)
     changes = e.extract()
     stats = e.statistics
 
@@ -335,7 +353,13 @@ def _gen(  # noqa: PLR0913, C901, PLR0915
     if date_fmt:
         version_string += f" {datetime.now(timezone.utc).strftime(date_fmt)}"
 
-    w = writer.new_writer(context, extension, dry_run=dry_run, change_template=cfg.change_template)
+    w = writer.new_writer(
+        context,
+        extension,
+        dry_run=dry_run,
+        show_diff=diff,
+        change_template=cfg.change_template,
+    )
 
     w.consume(version_string, cfg.type_headers, changes)
 
@@ -393,7 +417,9 @@ def _gen(  # noqa: PLR0913, C901, PLR0915
     post_process = cfg.post_process
     if post_process and processed:
         # Don't import httpx unless required
-        if per_issue_post_process is None:
+        try:
+            from changelog_gen.post_processor import per_issue_post_process
+        except ModuleNotFoundError:
             context.error("httpx required to execute post process, install with `--extras post-process`.")
             return
 
@@ -424,9 +450,11 @@ def test(
     verbose: int = typer.Option(0, "-v", "--verbose", help="Set output verbosity.", count=True, max=3),
 ) -> None:
     """Test a change or release template."""
+    from changelog_gen.vcs import new_vcs
+
     cfg = config.read()
     context = Context(cfg, verbose)
-    git = Git(context=context)
+    git = new_vcs(context)
     if template == TemplateType.change:
         log = git.get_log(commit_hash)
         e = extractor.ChangeExtractor(context=context, git=git)
@@ -434,15 +462,75 @@ def test(
         w = writer.new_writer(context, file_format)
         context.error(w._render_change(c))  # noqa: SLF001
     else:
-        logs = git.get_logs(commit_hash)
-        e = extractor.ChangeExtractor(context=context, git=git)
+        logs = git.iter_logs(commit_hash)
+        cache = _commit_cache(git, cfg)
+        e = extractor.ChangeExtractor(context=context, git=git, cache=cache)
         w = writer.new_writer(context, file_format)
-        changes = []
-        for log in logs:
-            c = e.process_log(*log)
-            if c is not None:
-                c.rendered = w._render_change(c)  # noqa: SLF001
-                changes.append(c)
+        changes = e.process_logs(logs)
+        for c in changes:
+            c.rendered = w._render_change(c)  # noqa: SLF001
 
         w.consume("v0.0.0", cfg.type_headers, changes)
         context.error("\n".join(w.content))
+
+
+@app.command("show")
+def show(
+    version: str,
+    verbose: int = typer.Option(0, "-v", "--verbose", help="Set output verbosity.", count=True, max=3),
+) -> None:
+    """Display the changelog entries for a release."""
+    cfg = config.read()
+    context = Context(cfg, verbose)
+
+    extension = util.detect_extension()
+    if extension is None:
+        context.error("No CHANGELOG file detected, run `changelog init`")
+        raise typer.Exit(code=1)
+
+    w = writer.new_writer(context, extension)
+    section = w.show(version, [cfg.version_string.format(new_version=version), f"v{version}"])
+    if section is None:
+        context.error("Release %s not found in %s.", version, w.changelog.name)
+        raise typer.Exit(code=1)
+
+    typer.echo(section.rstrip("\n"))
+
+
+@app.command("replay")
+def replay(
+    journal: Optional[Path] = typer.Option(
+        None,
+        help="Journal of failed post process requests, defaults to configured `post_process.journal`.",
+        show_default=False,
+    ),
+    *,
+    dry_run: bool = typer.Option(False, "--dry-run", help="Don't send requests, display them."),  # noqa: FBT003
+    verbose: int = typer.Option(0, "-v", "--verbose", help="Set output verbosity.", count=True, max=3),
+) -> None:
+    """Resend failed post process requests."""
+    cfg = config.read()
+    context = Context(cfg, verbose)
+
+    try:
+        from changelog_gen.post_processor import replay_journal
+    except ModuleNotFoundError:  # pragma: no cover
+        context.error("httpx required to execute post process, install with `--extras post-process`.")
+        raise typer.Exit(code=1) from None
+
+    if cfg.post_process is None:
+        context.error("No post_process configuration found.")
+        raise typer.Exit(code=1)
+
+    journal = journal or (Path(cfg.post_process.journal) if cfg.post_process.journal else None)
+    if journal is None:
+        context.error("No journal provided, use `--journal` or configure `post_process.journal`.")
+        raise typer.Exit(code=1)
+
+    if not journal.exists():
+        context.error("No failed requests to replay.")
+        return
+
+    summary = replay_journal(context, cfg.post_process, journal, dry_run=dry_run)
+    if summary.failed:
+        raise typer.Exit(code=1)
@@ -30,6 +30,19 @@ FOOTER_PARSERS = [
     r"(Authors)(: )(.*)",
 ]
 
+# Common github footers, parsed when `github.extract_common_footers` is enabled.
+GITHUB_FOOTER_PARSERS = (
+    r"(close)( )(#[\w-]+)",
+    r"(closes)( )(#[\w-]+)",
+    r"(closed)( )(#[\w-]+)",
+    r"(fix)( )(#[\w-]+)",
+    r"(fixes)( )(#[\w-]+)",
+    r"(fixed)( )(#[\w-]+)",
+    r"(resolve)( )(#[\w-]+)",
+    r"(resolves)( )(#[\w-]+)",
+    r"(resolved)( )(#[\w-]+)",
+)
+
 
 @dataclasses.dataclass
 class PostProcessConfig:
@@ -40,11 +53,29 @@ class PostProcessConfig:
     # The body to send as a post-processing command,
     # can have the entries: ::issue_ref::, ::version::
     body_template: str = '{"body": "Released on {{ version }}"}'
+    # Optional body to send once per target link, rendered with `changes`
+    # (all changes referencing the target), `source` and `version`.
+    aggregate_body_template: str | None = None
     auth_type: str = "basic"  # future proof config
     headers: dict | None = None
     # Name of an environment variable to use as HTTP Basic Auth parameters.
     # The variable should contain "{user}:{api_key}"
     auth_env: str | None = None
+    # Maximum number of requests in flight at once.
+    concurrency: int = 1
+    # Per request timeout in seconds.
+    timeout: float = 5.0
+    # Negotiate HTTP/2 where supported by the server, requires `h2`.
+    http2: bool = False
+    # Total attempts per request, retrying on connection errors, 429 and 5xx responses.
+    max_attempts: int = 1
+    # Exponential backoff base delay and cap between attempts, in seconds.
+    backoff_factor: float = 0.5
+    backoff_max: float = 30.0
+    # Maximum requests per second, across all concurrent requests.
+    rate_limit: float | None = None
+    # File to record failed requests in, for resending with `changelog replay`.
+    journal: str | None = None
 
 
 @dataclasses.dataclass
@@ -93,6 +124,11 @@ class Config:
 
     # Version bumping
     files: dict = dataclasses.field(default_factory=dict)
+    # Stage version file updates across a pool of threads, 1 to update in sequence.
+    replace_workers: int = 1
+
+    # Version control backend, `git` or `pygit2`
+    vcs_backend: str = "git"
 
     # Github helpers
     github: GithubConfig | None = None
@@ -106,6 +142,11 @@ class Config:
     link_generators: list[dict[str, str]] = dataclasses.field(default_factory=list)
     change_template: str | None = None
     release_template: str | None = None
+    # Cache parsed commits in the git directory between runs.
+    commit_cache: bool = False
+    commit_cache_size: int = 10000
+    # Parse commits across a pool of worker processes, 1 to parse in process.
+    parse_workers: int = 1
 
     # Hooks
     post_process: PostProcessConfig | None = None
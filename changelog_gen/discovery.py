@@ -0,0 +1,166 @@
+"""Expansion of glob and directory `files` entries against files tracked in the repository."""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import re
+import typing as t
+from pathlib import Path, PurePosixPath
+
+from changelog_gen import errors
+from changelog_gen.util import timer
+
+if t.TYPE_CHECKING:
+    from changelog_gen.vcs import BaseVcs
+
+logger = logging.getLogger(__name__)
+
+# Increment when the cached file set format changes to invalidate existing caches.
+DISCOVERY_VERSION = 2
+
+GLOB_CHARS = frozenset("*?[")
+
+
+def is_glob(filename: str) -> bool:
+    """Check if a configured filename is a glob pattern."""
+    return any(char in GLOB_CHARS for char in filename)
+
+
+@functools.cache
+def _compile(pattern: str) -> re.Pattern:
+    """Translate a glob to a regex, `*` and `?` don't cross directories, `**` matches any depth."""
+    regex, i = [], 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and (end := pattern.find("]", i + 2)) != -1:
+            body = pattern[i + 1 : end]
+            if body.startswith("!"):
+                body = f"^{body[1:]}"
+            regex.append(f"[{body}]")
+            i = end + 1
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(regex))
+
+
+def match(pattern: str, path: str) -> bool:
+    """Check if a `/` separated path matches a glob pattern."""
+    return _compile(pattern).fullmatch(path) is not None
+
+
+def _fingerprint(*parts: t.Any) -> str:  # noqa: ANN401
+    payload = json.dumps([DISCOVERY_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FileDiscovery:
+    """Expand glob and directory `files` entries into an entry per matched file.
+
+    Matching files are found from files tracked in the git index (`git
+    ls-files`), so untracked and ignored files are never matched. Expanded
+    entries are cached in the git directory keyed on the git index size and
+    modification time, the cache is reused until the index is next written.
+
+    Expanded entries record the configured filename they were expanded from
+    in `expanded_from`.
+    """
+
+    def __init__(self: t.Self, git: BaseVcs, cwd: Path) -> None:
+        self.git = git
+        self.cwd = cwd
+
+    @property
+    def path(self: t.Self) -> Path:
+        """Location of the cached file set."""
+        return self.git.git_dir / "changelog-gen" / "files.json"
+
+    def _is_expanded(self: t.Self, entry: dict) -> bool:
+        return is_glob(entry["filename"]) or (self.cwd / entry["filename"]).is_dir()
+
+    @timer
+    def expand(self: t.Self, entries: list[dict]) -> list[dict]:
+        """Expand configured entries, explicit filenames are returned unchanged."""
+        if not any(self._is_expanded(entry) for entry in entries):
+            return entries
+
+        key = _fingerprint(self.git.index_signature(), str(self.cwd), entries)
+        cached = self._load(key)
+        if cached is not None:
+            return cached
+
+        tracked = self._tracked()
+        expanded = []
+        for entry in entries:
+            if not self._is_expanded(entry):
+                expanded.append(entry)
+                continue
+
+            filename = entry["filename"]
+            pattern = filename if is_glob(filename) else f"{filename.rstrip('/')}/**"
+            exclude = entry.get("exclude", [])
+            if isinstance(exclude, str):
+                exclude = [exclude]
+
+            matched = [
+                path
+                for path in tracked
+                if match(pattern, path) and not any(match(exclusion, path) for exclusion in exclude)
+            ]
+            if not matched:
+                msg = f"No files matched '{filename}'."
+                raise errors.VersionError(msg)
+
+            rest = {k: v for k, v in entry.items() if k not in ("filename", "exclude")}
+            expanded.extend({"filename": path, "expanded_from": filename, **rest} for path in matched)
+
+        self._save(key, expanded)
+        return expanded
+
+    def _tracked(self: t.Self) -> list[str]:
+        """Tracked files below the current directory, relative to it."""
+        try:
+            prefix = PurePosixPath(self.cwd.resolve().relative_to(self.git.work_tree.resolve()).as_posix())
+        except ValueError:
+            return []
+
+        tracked = []
+        # Unmerged files are listed once per conflict stage.
+        for path in sorted(set(self.git.ls_files())):
+            relative = PurePosixPath(path)
+            if prefix.parts:
+                if relative.parts[: len(prefix.parts)] != prefix.parts:
+                    continue
+                relative = PurePosixPath(*relative.parts[len(prefix.parts) :])
+            tracked.append(str(relative))
+        return tracked
+
+    def _load(self: t.Self, key: str) -> list[dict] | None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("key") != key:
+            return None
+        return data.get("files")
+
+    def _save(self: t.Self, key: str, files: list[dict]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({"key": key, "files": files}))
+        except OSError as e:
+            logger.debug("Unable to cache discovered files in '%s': %s", self.path, e)
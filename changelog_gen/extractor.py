@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 import dataclasses
+import itertools
 import re
 import typing as t
-from collections import defaultdict
+from collections import defaultdict, deque
 
+from changelog_gen.config import GITHUB_FOOTER_PARSERS
 from changelog_gen.util import timer
 
 if t.TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from changelog_gen.cache import ChangeCache
     from changelog_gen.context import Context
-    from changelog_gen.vcs import Git
+    from changelog_gen.vcs import BaseVcs
+
+# Github appends `(#<pull_ref>)` to merge request titles.
+PR_REF = re.compile(r"\(#\d+\)$")
+PR_SUFFIX = re.compile(r" \(#\d+\)$")
+
+# Number of commits sent to a worker process at a time when parsing in parallel.
+PARSE_CHUNK_SIZE = 500
 
 
 @dataclasses.dataclass
@@ -61,13 +73,15 @@ class ChangeExtractor:
     def __init__(
         self: t.Self,
         context: Context,
-        git: Git,
+        git: BaseVcs,
         *,
         dry_run: bool = False,
         include_all: bool = False,
+        cache: ChangeCache | None = None,
     ) -> None:
         self.dry_run = dry_run
         self.include_all = include_all
+        self.cache = cache
         self.type_headers = context.config.type_headers
         if self.include_all:
             self.type_headers["_misc"] = "Miscellaneous"
@@ -80,6 +94,28 @@ class ChangeExtractor:
         types = "|".join(self.type_headers.keys())
         self.reg = re.compile(rf"^({types})(\([\w\-\.]+\))?(!)?: (.*)([\s\S]*)", re.IGNORECASE)
 
+        footer_parsers = list(context.config.footer_parsers)
+        if context.config.github and context.config.github.extract_common_footers:
+            footer_parsers.extend(GITHUB_FOOTER_PARSERS)
+        self.footer_parsers = tuple(re.compile(parser, re.IGNORECASE) for parser in footer_parsers)
+        # Combine all footer parsers into a single alternation, allowing lines
+        # that match no footer to be discarded with a single scan.
+        try:
+            self.footer_prefilter = re.compile(
+                "|".join(f"(?:{parser})" for parser in footer_parsers),
+                re.IGNORECASE,
+            )
+        except re.error:
+            # Parsers that can't be combined (duplicate group names, inline flags) are checked individually.
+            self.footer_prefilter = None
+
+        self.extractors = []
+        for extractor in context.config.extractors:
+            footer_keys = extractor["footer"]
+            if not isinstance(footer_keys, list):
+                footer_keys = [footer_keys]
+            self.extractors.append(([fkey.lower() for fkey in footer_keys], re.compile(extractor["pattern"])))
+
     def process_log(self, short_hash: str, commit_hash: str, log: str) -> Change | None:  # noqa: C901, PLR0912, PLR0915
         """Process a commit log into a Change object."""
         m = self.reg.match(log)
@@ -92,11 +128,11 @@ class ChangeExtractor:
             scope = (m[2] or "").replace("(", "").replace(")", "")
             breaking = m[3] is not None
             description = m[4].strip()
-            prm = re.search(r"\(#\d+\)$", description)
+            prm = PR_REF.search(description)
             if prm is not None:
                 # Strip githubs additional link information from description.
                 if self.context.config.github and self.context.config.github.strip_pr_from_description:
-                    description = re.sub(r" \(#\d+\)$", "", description)
+                    description = PR_SUFFIX.sub("", description)
 
                 if self.context.config.github and self.context.config.github.extract_pr_from_description:
                     footers["pr"] = Footer("PR", ": ", prm.group()[1:-1])
@@ -115,40 +151,25 @@ class ChangeExtractor:
             if breaking:
                 self.context.info("  Breaking change detected:\n    %s: %s", commit_type, description)
 
-            footer_parsers = self.context.config.footer_parsers
-            if self.context.config.github and self.context.config.github.extract_common_footers:
-                footer_parsers.extend([
-                    r"(close)( )(#[\w-]+)",
-                    r"(closes)( )(#[\w-]+)",
-                    r"(closed)( )(#[\w-]+)",
-                    r"(fix)( )(#[\w-]+)",
-                    r"(fixes)( )(#[\w-]+)",
-                    r"(fixed)( )(#[\w-]+)",
-                    r"(resolve)( )(#[\w-]+)",
-                    r"(resolves)( )(#[\w-]+)",
-                    r"(resolved)( )(#[\w-]+)",
-                ])
-
             for line in details.split("\n"):
-                for parser in self.context.config.footer_parsers:
-                    m = re.match(parser, line, re.IGNORECASE)
+                if self.footer_prefilter is not None and self.footer_prefilter.match(line) is None:
+                    continue
+
+                for parser in self.footer_parsers:
+                    m = parser.match(line)
                     if m is not None:
-                        self.context.info("  '%s' footer extracted '%s%s%s'", parser, m[1], m[2], m[3])
+                        self.context.info("  '%s' footer extracted '%s%s%s'", parser.pattern, m[1], m[2], m[3])
                         footers[m[1].lower()] = Footer(m[1], m[2], m[3])
 
             extractions = defaultdict(list)
 
-            for extractor in self.context.config.extractors:
-                footer_keys = extractor["footer"]
-                if not isinstance(footer_keys, list):
-                    footer_keys = [footer_keys]
-
+            for footer_keys, pattern in self.extractors:
                 for fkey in footer_keys:
-                    footer = footers.get(fkey.lower())
+                    footer = footers.get(fkey)
                     if footer is None:
                         continue
 
-                    for m in re.finditer(extractor["pattern"], footer.value):
+                    for m in pattern.finditer(footer.value):
                         for k, v in m.groupdict().items():
                             extractions[k].append(v)
 
@@ -200,24 +221,135 @@ class ChangeExtractor:
 
         return None
 
+    def _cached(self: t.Self, short_hash: str, commit_hash: str) -> tuple[bool, Change | None] | None:
+        """Fetch a previously cached result for a commit, counting it in statistics."""
+        cached = self.cache.get(commit_hash)
+        if cached is not None:
+            conventional, _ = cached
+            self._statistics["conventional" if conventional else "nonconventional"] += 1
+            self.context.debug("  Using cached commit log: %s", short_hash)
+        return cached
+
+    def _process_cached(self: t.Self, short_hash: str, commit_hash: str, log: str) -> Change | None:
+        """Process a commit log, using a previously cached result if available."""
+        cached = self._cached(short_hash, commit_hash)
+        if cached is not None:
+            return cached[1]
+
+        conventional, change = self._parse(short_hash, commit_hash, log)
+        self.cache.put(commit_hash, conventional, change)
+        return change
+
+    def _parse(self: t.Self, short_hash: str, commit_hash: str, log: str) -> tuple[bool, Change | None]:
+        """Process a commit log, returning whether it was conventional along with the change."""
+        conventional = self._statistics["conventional"]
+        change = self.process_log(short_hash, commit_hash, log)
+        return self._statistics["conventional"] > conventional, change
+
+    def _segments(self: t.Self, logs: t.Iterable[tuple[str, str, str]]) -> t.Iterator[list[tuple]]:
+        """Group commit logs in order into segments of up to `PARSE_CHUNK_SIZE` uncached logs.
+
+        Segment items are `(cached, log)`, where cached commits have no log.
+        """
+        segment, pending = [], 0
+        for short_hash, commit_hash, log in logs:
+            self._statistics["commits"] += 1
+            cached = self._cached(short_hash, commit_hash) if self.cache is not None else None
+            if cached is not None:
+                segment.append((cached, None))
+                continue
+            segment.append((None, (short_hash, commit_hash, log)))
+            pending += 1
+            if pending == PARSE_CHUNK_SIZE:
+                yield segment
+                segment, pending = [], 0
+        if segment:
+            yield segment
+
+    def _collect(self: t.Self, changes: list[Change], segment: list[tuple], parsed: list[tuple]) -> None:
+        """Add changes from a segment in commit order, caching newly parsed results."""
+        parsed = iter(parsed)
+        for cached, log in segment:
+            if cached is not None:
+                conventional, change = cached
+            else:
+                conventional, change = next(parsed)
+                if self.cache is not None:
+                    self.cache.put(log[1], conventional, change)
+            if change is not None:
+                changes.append(change)
+
+    def _process_parallel(self: t.Self, logs: t.Iterable[tuple[str, str, str]]) -> list[Change]:
+        """Process commit logs in chunks across a pool of worker processes, preserving commit order.
+
+        Chunks are submitted as logs are read, with a bounded number in flight,
+        so memory use does not grow with the number of commits.
+        """
+        # multiprocessing is slow to import, and only needed when parsing in parallel.
+        from concurrent.futures import ProcessPoolExecutor
+
+        changes = []
+        segments = self._segments(logs)
+        first = next(segments, [])
+        second = next(segments, None)
+        if second is None:
+            # A single chunk is parsed in process, rather than starting a pool.
+            self._collect(changes, first, [self._parse(*log) for cached, log in first if cached is None])
+            return changes
+
+        workers = self.context.config.parse_workers
+        initargs = (self.context, self.include_all)
+        in_flight = deque()
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+            for segment in itertools.chain([first, second], segments):
+                unparsed = [log for cached, log in segment if cached is None]
+                in_flight.append((segment, pool.submit(_process_chunk, unparsed)))
+                if len(in_flight) > 2 * workers:
+                    self._collect_future(changes, *in_flight.popleft())
+            while in_flight:
+                self._collect_future(changes, *in_flight.popleft())
+
+        return changes
+
+    def _collect_future(self: t.Self, changes: list[Change], segment: list[tuple], future: Future) -> None:
+        parsed = future.result()
+        for conventional, _ in parsed:
+            self._statistics["conventional" if conventional else "nonconventional"] += 1
+        self._collect(changes, segment, parsed)
+
+    @timer
+    def process_logs(self: t.Self, logs: t.Iterable[tuple[str, str, str]]) -> list[Change]:
+        """Process commit logs into a list of changes."""
+        process = self.process_log if self.cache is None else self._process_cached
+
+        self._statistics["commits"] = 0
+        changes = []
+        if self.context.config.parse_workers > 1:
+            changes = self._process_parallel(logs)
+        else:
+            for short_hash, commit_hash, log in logs:
+                self._statistics["commits"] += 1
+                change = process(short_hash, commit_hash, log)
+                if change is not None:
+                    changes.append(change)
+
+        if self.cache is not None:
+            self.cache.flush()
+            self.cache.close()
+
+        return changes
+
     @timer
     def extract(self: t.Self) -> list[Change]:
         """Iterate over commit logs and generate list of changes."""
         current_version = self.context.config.current_version
         # find tag from current version
         tag = self.git.find_tag(current_version)
-        logs = self.git.get_logs(tag)
+        logs = self.git.iter_logs(tag)
 
         self.context.warning("Extracting commit log changes.")
 
-        self._statistics["commits"] = len(logs)
-        changes = []
-        for short_hash, commit_hash, log in logs:
-            change = self.process_log(short_hash, commit_hash, log)
-            if change is not None:
-                changes.append(change)
-
-        return changes
+        return self.process_logs(logs)
 
     @property
     def statistics(self: t.Self) -> dict[str, int]:
@@ -225,6 +357,19 @@ class ChangeExtractor:
         return self._statistics
 
 
+# Extractor for the current worker process, built once per worker when parsing in parallel.
+_worker_extractor = None
+
+
+def _init_worker(context: Context, include_all: bool) -> None:  # noqa: FBT001
+    global _worker_extractor  # noqa: PLW0603
+    _worker_extractor = ChangeExtractor(context, None, include_all=include_all)
+
+
+def _process_chunk(logs: list[tuple[str, str, str]]) -> list[tuple[bool, Change | None]]:
+    return [_worker_extractor._parse(*log) for log in logs]  # noqa: SLF001
+
+
 @timer
 def extract_semver(
     changes: list[Change],
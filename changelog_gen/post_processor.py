@@ -1,23 +1,95 @@
 from __future__ import annotations
 
+import dataclasses
+import email.utils
+import json
 import os
+import random
+import threading
+import time
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from http import HTTPStatus
+from pathlib import Path
 
 import httpx
 import typer
 from aws4.client import HttpxAWS4Auth
 from aws4.key_pair import KeyPair
-from jinja2 import BaseLoader, Environment
 
 from changelog_gen.extractor import Link
 from changelog_gen.util import timer
+from changelog_gen.writer import compile_template
 
 if t.TYPE_CHECKING:
     from changelog_gen.config import PostProcessConfig
     from changelog_gen.context import Context
     from changelog_gen.extractor import Change
 
+# Response statuses that are considered transient, and will be retried.
+RETRY_STATUSES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+# Requests with these verbs can be safely resent after the server may have received them.
+IDEMPOTENT_VERBS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Transport errors raised before a request is sent, safe to retry for any verb.
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+@dataclasses.dataclass
+class PostProcessResult:
+    """Outcome of a single post process request."""
+
+    link: Link
+    body: str
+    status_code: int | None = None
+    error: str | None = None
+    attempts: int = 1
+
+    @property
+    def ok(self: t.Self) -> bool:
+        """Request completed successfully."""
+        return self.error is None
+
+
+@dataclasses.dataclass
+class PostProcessSummary:
+    """Collected outcomes of all post process requests."""
+
+    succeeded: list[PostProcessResult] = dataclasses.field(default_factory=list)
+    failed: list[PostProcessResult] = dataclasses.field(default_factory=list)
+
+
+class RateLimiter:
+    """Thread safe token bucket, limiting requests to `rate` per second."""
+
+    def __init__(self: t.Self, rate: float) -> None:
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self: t.Self) -> None:
+        """Block until a request is permitted."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 
 class BearerAuth(httpx.Auth):
     """Implement Bearer token auth class for httpx."""
@@ -65,12 +137,236 @@ def make_client(context: Context, cfg: PostProcessConfig) -> httpx.Client:
             else:
                 auth = httpx.BasicAuth(username=username, password=api_key)
 
-    return httpx.Client(
-        auth=auth,
-        headers=cfg.headers,
+    concurrency = max(cfg.concurrency, 1)
+    try:
+        return httpx.Client(
+            auth=auth,
+            headers=cfg.headers,
+            timeout=cfg.timeout,
+            http2=cfg.http2,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+    except ImportError as e:
+        context.error("h2 required to use http2, install with `pip install httpx[http2]`.")
+        raise typer.Exit(code=1) from e
+
+
+@timer
+def render_requests(cfg: PostProcessConfig, changes: list[Change], version_tag: str) -> list[tuple[Link, str]]:
+    """Render the link and body for each issue reference in provided changes.
+
+    Requests are deduplicated by target link, identical requests generated by
+    multiple changes are only sent once. If an aggregate body template is
+    configured, a single request is rendered per target with all of the
+    changes that reference it.
+    """
+    link_generator = cfg.link_generator
+    rtemplate = compile_template(cfg.body_template)
+    text_template = link_generator.get("text", "{0}")
+    link_template = link_generator["link"]
+
+    # link -> (Link, source value, referencing changes)
+    targets = {}
+    for change in changes:
+        source = change.extractions.get(link_generator["source"].lower())
+        if not source:
+            continue
+
+        for value in source:
+            url = link_template.format(value)
+            if url not in targets:
+                targets[url] = (Link(text_template.format(value), url), value, [])
+            targets[url][2].append(change)
+
+    requests = []
+    if cfg.aggregate_body_template:
+        atemplate = compile_template(cfg.aggregate_body_template)
+        for link, value, changes_ in targets.values():
+            body = atemplate.render(source=value, changes=changes_, version=version_tag)
+            requests.append((link, body))
+        return requests
+
+    seen = set()
+    for link, value, changes_ in targets.values():
+        for change in changes_:
+            body = rtemplate.render(source=value, change=change, version=version_tag, **change.extractions)
+            if body not in seen:
+                seen.add(body)
+                requests.append((link, body))
+        seen.clear()
+
+    return requests
+
+
+def retry_after(response: httpx.Response) -> float | None:
+    """Extract delay in seconds from a Retry-After header, if present."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        dt = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return max((dt - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff(cfg: PostProcessConfig, attempt: int) -> float:
+    """Exponential backoff with full jitter for a failed attempt."""
+    return random.uniform(0, min(cfg.backoff_max, cfg.backoff_factor * 2 ** (attempt - 1)))  # noqa: S311
+
+
+def _rejected(status_code: int, delay: float | None) -> bool:
+    """Check if an error response indicates the request was rejected without being handled."""
+    return status_code == HTTPStatus.TOO_MANY_REQUESTS or (
+        status_code == HTTPStatus.SERVICE_UNAVAILABLE and delay is not None
     )
 
 
+def _attempt(
+    client: httpx.Client,
+    cfg: PostProcessConfig,
+    link: Link,
+    body: str,
+    attempt: int,
+) -> tuple[PostProcessResult, bool, float | None]:
+    """Send a request once, returning the result, if it can be retried and any server requested delay."""
+    idempotent = cfg.verb.upper() in IDEMPOTENT_VERBS
+    try:
+        r = client.request(
+            method=cfg.verb,
+            url=link.link,
+            content=body,
+        )
+    except httpx.TransportError as e:
+        result = PostProcessResult(link, body, error=f"{type(e).__name__}: {e}", attempts=attempt)
+        return result, idempotent or isinstance(e, CONNECT_ERRORS), None
+
+    try:
+        r.raise_for_status()
+    except httpx.HTTPError as e:
+        result = PostProcessResult(link, body, r.status_code, error=e.response.text, attempts=attempt)
+        if r.status_code not in RETRY_STATUSES:
+            return result, False, None
+        delay = retry_after(r)
+        if not idempotent and not _rejected(r.status_code, delay):
+            # The server may have handled the request before failing.
+            return result, False, None
+        return result, delay is None or delay <= cfg.backoff_max, delay
+
+    return PostProcessResult(link, body, r.status_code, attempts=attempt), False, None
+
+
+def send_request(
+    client: httpx.Client,
+    cfg: PostProcessConfig,
+    link: Link,
+    body: str,
+    limiter: RateLimiter | None = None,
+) -> PostProcessResult:
+    """Send a single post process request, capturing failures in the result.
+
+    Connection errors and transient error responses are retried up to
+    `cfg.max_attempts` times, waiting for the server provided Retry-After
+    delay if present, otherwise backing off exponentially. Errors after a
+    request may have been received (such as read timeouts and 5xx responses)
+    are only retried for idempotent verbs, other verbs are retried on 429, or
+    503 with a Retry-After header. Requests are not retried if the server asks
+    for a delay longer than `cfg.backoff_max`.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        if limiter is not None:
+            limiter.acquire()
+
+        result, retry, delay = _attempt(client, cfg, link, body, attempt)
+        if not retry or attempt >= cfg.max_attempts:
+            return result
+
+        time.sleep(delay if delay is not None else backoff(cfg, attempt))
+
+
+def write_journal(path: Path, results: list[PostProcessResult]) -> None:
+    """Append failed requests to the journal, one json object per line."""
+    with path.open("a") as f:
+        for result in results:
+            entry = {"text": result.link.text, "link": result.link.link, "body": result.body, "error": result.error}
+            f.write(json.dumps(entry) + "\n")
+
+
+def read_journal(path: Path) -> list[tuple[Link, str]]:
+    """Read failed requests from the journal."""
+    with path.open() as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return [(Link(entry["text"], entry["link"]), entry["body"]) for entry in entries]
+
+
+@timer
+def dispatch(
+    context: Context,
+    cfg: PostProcessConfig,
+    requests: list[tuple[Link, str]],
+    *,
+    dry_run: bool = False,
+) -> PostProcessSummary:
+    """Send rendered requests, reporting a summary of the results.
+
+    Requests are dispatched across up to `cfg.concurrency` threads sharing a
+    single pooled client, results are reported in request order once all
+    requests have completed.
+    """
+    client = make_client(context, cfg)
+
+    summary = PostProcessSummary()
+    if dry_run:
+        for link, body in requests:
+            context.indent()
+            context.warning("Would request: %s %s %s", cfg.verb, link.link, body)
+        context.reset()
+        return summary
+
+    limiter = RateLimiter(cfg.rate_limit) if cfg.rate_limit else None
+
+    start = time.perf_counter()
+    with client, ThreadPoolExecutor(max_workers=max(cfg.concurrency, 1)) as executor:
+        results = list(executor.map(lambda request: send_request(client, cfg, *request, limiter), requests))
+    context.debug("Post process request time %fms", (time.perf_counter() - start) * 1000)
+
+    for result in results:
+        context.indent()
+        context.info("Request: %s %s", cfg.verb, result.link.link)
+        context.indent()
+        if result.status_code is not None:
+            context.info("Response: %s", HTTPStatus(result.status_code).name)
+
+        if result.ok:
+            summary.succeeded.append(result)
+        else:
+            summary.failed.append(result)
+            context.error("Post process request failed.")
+            context.warning("%s", result.error)
+    context.reset()
+
+    if summary.failed:
+        context.error(
+            "Post process completed with failures, %s succeeded, %s failed.",
+            len(summary.succeeded),
+            len(summary.failed),
+        )
+    else:
+        context.warning("Post process completed, %s succeeded.", len(summary.succeeded))
+
+    return summary
+
+
 @timer
 def per_issue_post_process(
     context: Context,
@@ -79,45 +375,47 @@ def per_issue_post_process(
     version_tag: str,
     *,
     dry_run: bool = False,
-) -> None:
+) -> PostProcessSummary | None:
     """Run post process for all provided issue references."""
-    link_generator, body_template = cfg.link_generator, cfg.body_template
-    if link_generator is None:
-        return
+    if cfg.link_generator is None:
+        return None
     context.warning("Post processing:")
 
-    client = make_client(context, cfg)
+    start = time.perf_counter()
+    requests = render_requests(cfg, changes, version_tag)
+    context.debug("Post process render time %fms", (time.perf_counter() - start) * 1000)
 
-    for change in changes:
-        link = None
+    summary = dispatch(context, cfg, requests, dry_run=dry_run)
 
-        source = change.extractions.get(link_generator["source"].lower())
-        if not source:
-            continue
+    if summary.failed and cfg.journal:
+        context.warning("Recording failed requests in '%s'.", cfg.journal)
+        write_journal(Path(cfg.journal), summary.failed)
 
-        text_template = link_generator.get("text", "{0}")
-        link_template = link_generator["link"]
-        for value in source:
-            link = Link(text_template.format(value), link_template.format(value))
+    return summary
 
-            rtemplate = Environment(loader=BaseLoader()).from_string(body_template)  # noqa: S701
 
-            body = rtemplate.render(source=value, change=change, version=version_tag, **change.extractions)
-            context.indent()
-            if dry_run:
-                context.warning("Would request: %s %s %s", cfg.verb, link.link, body)
-            else:
-                context.info("Request: %s %s", cfg.verb, link.link)
-                r = client.request(
-                    method=cfg.verb,
-                    url=link.link,
-                    content=body,
-                )
-                context.indent()
-                try:
-                    context.info("Response: %s", HTTPStatus(r.status_code).name)
-                    r.raise_for_status()
-                except httpx.HTTPError as e:
-                    context.error("Post process request failed.")
-                    context.warning("%s", e.response.text)
-    context.reset()
+@timer
+def replay_journal(
+    context: Context,
+    cfg: PostProcessConfig,
+    journal: Path,
+    *,
+    dry_run: bool = False,
+) -> PostProcessSummary:
+    """Resend failed requests recorded in the journal.
+
+    Requests that fail again are kept in the journal, the journal is removed
+    once all requests have been delivered.
+    """
+    requests = read_journal(journal)
+    context.warning("Replaying %s failed requests from '%s':", len(requests), journal)
+
+    summary = dispatch(context, cfg, requests, dry_run=dry_run)
+    if dry_run:
+        return summary
+
+    journal.unlink()
+    if summary.failed:
+        write_journal(journal, summary.failed)
+
+    return summary
@@ -1,20 +1,159 @@
-import logging
+from __future__ import annotations
+
+import atexit
+import dataclasses
+import functools
+import json
+import math
+import os
+import sys
+import threading
 import time
 import typing as t
+from collections import defaultdict
+from pathlib import Path
 
-logger = logging.getLogger(__name__)
+# Enable profiling of `timer` decorated functions, `table` (or any value) to
+# output a summary to stderr on exit, or a `.json` path to write a chrome trace.
+PROFILE_ENV = "CHANGELOG_GEN_PROFILE"
 
 
-def timer(func: t.Callable) -> t.Callable:
-    """Timing decorator."""
+@dataclasses.dataclass
+class Span:
+    """A single timed call, times in nanoseconds."""
 
-    def wrapper(*arg, **kw) -> t.Any:  # noqa: ANN401
-        t1 = time.time_ns()
+    name: str
+    start: int
+    duration: int
+    thread: int
+
+
+class Profiler:
+    """Collect timings of `timer` decorated functions.
+
+    Spans are recorded per call, nested calls are recorded as separate spans
+    that fall within their callers start and duration.
+    """
+
+    def __init__(self: t.Self) -> None:
+        self.spans = []
+        self.origin = time.perf_counter_ns()
+
+    def call(self: t.Self, name: str, func: t.Callable, /, *arg, **kw) -> t.Any:  # noqa: ANN401
+        """Call a function, recording a span for its duration."""
+        start = time.perf_counter_ns()
         try:
-            res = func(*arg, **kw)
+            return func(*arg, **kw)
         finally:
-            t2 = time.time_ns()
-            logger.debug("%s %fms", func.__name__, (t2 - t1) / 1000000)
-        return res
+            end = time.perf_counter_ns()
+            self.spans.append(Span(name, start - self.origin, end - start, threading.get_ident()))
+
+    def stats(self: t.Self) -> list[dict]:
+        """Summarise calls, total, mean and p95 duration per function, slowest total first."""
+        durations = defaultdict(list)
+        for span in self.spans:
+            durations[span.name].append(span.duration)
+
+        stats = []
+        for name, values in durations.items():
+            values.sort()
+            total = sum(values)
+            stats.append(
+                {
+                    "name": name,
+                    "calls": len(values),
+                    "total": total,
+                    "mean": total / len(values),
+                    "p95": values[math.ceil(len(values) * 0.95) - 1],
+                },
+            )
+        return sorted(stats, key=lambda s: s["total"], reverse=True)
+
+    def table(self: t.Self) -> str:
+        """Render stats as a table, durations in milliseconds."""
+        stats = self.stats()
+        width = max([len(s["name"]) for s in stats] + [len("function")])
+        lines = [f"{'function':<{width}} {'calls':>7} {'total':>10} {'mean':>10} {'p95':>10}"]
+        lines.extend(
+            f"{s['name']:<{width}} {s['calls']:>7} "
+            f"{s['total'] / 1e6:>10.3f} {s['mean'] / 1e6:>10.3f} {s['p95'] / 1e6:>10.3f}"
+            for s in stats
+        )
+        return "\n".join(lines)
+
+    def trace(self: t.Self) -> dict:
+        """Render spans in chrome trace event format, viewable in chrome://tracing, perfetto or speedscope."""
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": span.start / 1000,
+                    "dur": span.duration / 1000,
+                    "pid": pid,
+                    "tid": span.thread,
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def report(self: t.Self, target: str) -> None:
+        """Write a chrome trace to a `.json` target, otherwise output a table to stderr."""
+        if target.endswith(".json"):
+            Path(target).write_text(json.dumps(self.trace()))
+        else:
+            sys.stderr.write(self.table() + "\n")
+
+
+def _report(profiler: Profiler, target: str, pid: int) -> None:
+    """Report on exit from the process profiling was enabled in, worker processes don't report."""
+    import multiprocessing
+
+    # Forked workers inherit the exit handler, spawned workers import this module again.
+    if os.getpid() != pid or multiprocessing.parent_process() is not None:
+        return
+    profiler.report(target)
+
+
+def _profiler_from_env() -> Profiler | None:
+    target = os.environ.get(PROFILE_ENV)
+    if not target:
+        return None
+    profiler = Profiler()
+    atexit.register(_report, profiler, target, os.getpid())
+    return profiler
+
+
+_profiler = _profiler_from_env()
+
+
+def timer(func: t.Callable) -> t.Callable:
+    """Timing decorator, recording calls when profiling is enabled.
+
+    Profiling is checked once at decoration time, when disabled the function
+    is returned undecorated so that timed functions carry no call overhead.
+    """
+    profiler = _profiler
+    if profiler is None:
+        return func
+
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*arg, **kw) -> t.Any:  # noqa: ANN401
+        return profiler.call(name, func, *arg, **kw)
 
     return wrapper
+
+
+def span(name: str, func: t.Callable, /, *arg, **kw) -> t.Any:  # noqa: ANN401
+    """Call a function, recording it under `name` when profiling is enabled.
+
+    For timing calls individually where `timer` would group them, such as per
+    file or per request.
+    """
+    if _profiler is None:
+        return func(*arg, **kw)
+    return _profiler.call(name, func, *arg, **kw)
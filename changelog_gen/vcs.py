@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import typing as t
+from pathlib import Path
 
 import git
 
@@ -10,11 +11,31 @@ from changelog_gen.util import timer
 if t.TYPE_CHECKING:
     from changelog_gen.context import Context
 
-T = t.TypeVar("T", bound="Git")
+T = t.TypeVar("T", bound="BaseVcs")
 
+# Size of reads from the `git log` pipe when streaming commit logs.
+LOG_CHUNK_SIZE = 64 * 1024
 
-class Git:
-    """VCS implementation for git repositories."""
+
+TAG_PREFIX = "refs/tags/"
+
+
+def _parse_log_record(record: bytes) -> tuple[str, str, str]:
+    """Split a raw `%h:%H:%B` log record into its components."""
+    # Messages aren't guaranteed to be valid utf-8, decode as `git log` output is decoded by GitPython.
+    short_hash, commit_hash, message = record.decode("utf-8", errors="surrogateescape").split(":", 2)
+    return short_hash, commit_hash, message
+
+
+class BaseVcs:
+    """Base implementation for a version control backend.
+
+    Backends implement repository queries and the primitive add, commit, tag
+    and reset operations, while dry run handling and the release commit flow
+    are shared.
+    """
+
+    name = None
 
     @timer
     def __init__(
@@ -31,60 +52,241 @@ class Git:
         self._release = release
         self._tag = tag
         self.dry_run = dry_run
+
+    @property
+    def git_dir(self: T) -> Path:
+        """Path to the repository git directory."""
+        raise NotImplementedError
+
+    @property
+    def work_tree(self: T) -> Path:
+        """Path to the repository working tree."""
+        raise NotImplementedError
+
+    def get_current_info(self: T) -> dict[str, str]:
+        """Get current state info from the repository."""
+        raise NotImplementedError
+
+    def tags(self: T) -> frozenset[str]:
+        """Fetch all tag names in the repository."""
+        raise NotImplementedError
+
+    def existing_tags(self: T, names: t.Iterable[str]) -> frozenset[str]:
+        """Filter tag names to those that exist in the repository."""
+        return self.tags() & frozenset(names)
+
+    def iter_logs(self: T, tag: str | None) -> t.Iterator[tuple[str, str, str]]:
+        """Stream `(short_hash, commit_hash, message)` logs since last tag."""
+        raise NotImplementedError
+
+    def get_log(self: T, commit_hash: str) -> list:
+        """Fetch log from a commit hash."""
+        raise NotImplementedError
+
+    def ls_files(self: T) -> list[str]:
+        """Paths of files tracked in the index, relative to the working tree."""
+        raise NotImplementedError
+
+    def _add_paths(self: T, paths: list[str]) -> None:
+        raise NotImplementedError
+
+    def _commit_changes(self: T, message: str) -> None:
+        raise NotImplementedError
+
+    def _create_tag(self: T, tag: str) -> None:
+        raise NotImplementedError
+
+    def _reset(self: T) -> None:
+        raise NotImplementedError
+
+    def index_signature(self: T) -> tuple[int, int] | None:
+        """Size and modification time of the git index, changing whenever the index is written.
+
+        Read without writing to the repository, unlike hashing the index tree
+        this is also available while merge conflicts are unresolved.
+        """
+        try:
+            stat = (self.git_dir / "index").stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    @timer
+    def find_tag(self: T, version_string: str) -> str | None:
+        """Find a version tag given the version string.
+
+        Given a version string `0.1.2` find the version tag using the
+        configured `version_string` format, falling back to `0.1.2` or `v0.1.2`.
+        """
+        candidates = (
+            self.context.config.version_string.format(new_version=version_string),
+            version_string,
+            f"v{version_string}",
+        )
+        tags = self.existing_tags(candidates)
+        return next((tag for tag in candidates if tag in tags), None)
+
+    @timer
+    def get_logs(self: T, tag: str | None) -> list:
+        """Fetch logs since last tag."""
+        return [list(log) for log in self.iter_logs(tag)]
+
+    @timer
+    def add_paths(self: T, paths: list[str]) -> None:
+        """Add path to git repository."""
+        if self.dry_run:
+            self.context.warning("  Would add paths '%s' to Git", "', '".join(paths))
+            return
+        self._add_paths(paths)
+
+    @timer
+    def commit(self: T, current: str, new: str, tag: str, paths: list[str] | None = None) -> None:
+        """Commit changes to git repository."""
+        self.context.warning("Would prepare Git commit")
+        paths = paths or []
+
+        if paths:
+            self.add_paths(paths)
+
+        msg = [
+            f"Update CHANGELOG for {new}",
+            f"Bump version: {current} → {new}" if self._release else "",
+        ]
+
+        message = "\n".join(msg).strip()
+        if self.dry_run or not self._commit:
+            self.context.warning("  Would commit to Git with message '%s", message)
+            return
+
+        self._commit_changes(message)
+
+        if not self._tag or not self._release:
+            self.context.warning("  Would tag with version '%s", tag)
+            return
+
+        try:
+            self._create_tag(tag)
+        except errors.VcsError:
+            self.revert()
+            raise
+
+    @timer
+    def revert(self: T) -> None:
+        """Revert a commit."""
+        if self.dry_run:
+            self.context.warning("Would revert commit in Git")
+            return
+        self._reset()
+
+
+class Git(BaseVcs):
+    """VCS implementation for git repositories, using GitPython."""
+
+    name = "git"
+
+    @timer
+    def __init__(self: T, context: Context, **kwargs) -> None:
+        super().__init__(context, **kwargs)
         try:
             self.repo = git.Repo()
         except git.exc.InvalidGitRepositoryError as e:
             msg = "No git repository found, please run git init."
             raise errors.VcsError(msg) from e
 
+    @property
+    def git_dir(self: T) -> Path:
+        """Path to the repository git directory."""
+        return Path(self.repo.git_dir)
+
+    @property
+    def work_tree(self: T) -> Path:
+        """Path to the repository working tree."""
+        return Path(self.repo.working_tree_dir)
+
     @timer
     def get_current_info(self: T) -> dict[str, str]:
-        """Get current state info from git."""
-        branch = self.repo.active_branch.name
-        try:
-            missing_local = list(self.repo.iter_commits(f"HEAD..origin/{branch}"))
-        except git.GitCommandError as e:
-            if f"bad revision 'HEAD..origin/{branch}'" in str(e):
-                missing_local = []
-            else:
-                msg = f"Unable to determine missing commit status: {e}"
-                raise errors.VcsError(msg) from e
+        """Get current state info from git.
 
+        Branch, dirty state and divergence from the upstream branch are read
+        from a single `git status` call. If `origin/<branch>` is not the
+        tracked upstream, divergence is counted with `git rev-list` instead.
+        """
         try:
-            missing_remote = list(self.repo.iter_commits(f"origin/{branch}..HEAD"))
+            status = self.repo.git.status(porcelain="v2", branch=True, untracked_files="no")
         except git.GitCommandError as e:
-            if f"bad revision 'origin/{branch}..HEAD'" in str(e):
-                missing_remote = ["missing"]
+            msg = f"Unable to determine repository status: {e}"
+            raise errors.VcsError(msg) from e
+
+        headers = {}
+        dirty = False
+        for line in status.splitlines():
+            if line.startswith("# "):
+                key, _, value = line[2:].partition(" ")
+                headers[key] = value
+            elif line:
+                dirty = True
+
+        branch = headers["branch.head"]
+        remote = f"origin/{branch}"
+        if headers.get("branch.upstream") == remote and "branch.ab" in headers:
+            ahead, behind = (abs(int(count)) for count in headers["branch.ab"].split())
+        else:
+            try:
+                counts = self.repo.git.rev_list(f"{remote}...HEAD", left_right=True, count=True)
+            except git.GitCommandError as e:
+                if "unknown revision" not in str(e) and "bad revision" not in str(e):
+                    msg = f"Unable to determine missing commit status: {e}"
+                    raise errors.VcsError(msg) from e
+                # No remote branch, all local commits are missing from remote.
+                behind, ahead = 0, 1
             else:
-                msg = f"Unable to determine missing commit status: {e}"
-                raise errors.VcsError(msg) from e
+                behind, ahead = (int(count) for count in counts.split())
 
         return {
-            "missing_local": missing_local != [],
-            "missing_remote": missing_remote != [],
-            "dirty": self.repo.is_dirty(),
+            "missing_local": behind > 0,
+            "missing_remote": ahead > 0,
+            "dirty": dirty,
             "branch": branch,
         }
 
     @timer
-    def find_tag(self: T, version_string: str) -> str | None:
-        """Find a version tag given the version string.
-
-        Given a version string `0.1.2` find the version tag `v0.1.2`, `0.1.2` etc.
-        """
-        tag = self.repo.git.tag("-l", f"*{version_string}")
-        return tag or None
+    def tags(self: T) -> frozenset[str]:
+        """Fetch all tag names in the repository."""
+        output = self.repo.git.for_each_ref("refs/tags", format="%(refname)")
+        return frozenset(ref[len(TAG_PREFIX) :] for ref in output.splitlines())
 
     @timer
-    def get_logs(self: T, tag: str | None) -> list:
-        """Fetch logs since last tag."""
+    def existing_tags(self: T, names: t.Iterable[str]) -> frozenset[str]:
+        """Filter tag names to those that exist in the repository, looking up only the named refs."""
+        names = frozenset(names)
+        output = self.repo.git.for_each_ref(*(f"{TAG_PREFIX}{name}" for name in names), format="%(refname)")
+        # for-each-ref patterns also match refs nested below a name, keep exact matches only.
+        return frozenset(ref[len(TAG_PREFIX) :] for ref in output.splitlines()) & names
+
+    def iter_logs(self: T, tag: str | None) -> t.Iterator[tuple[str, str, str]]:
+        """Stream logs since last tag.
+
+        Output from `git log` is read from the process pipe in chunks, and each
+        `(short_hash, commit_hash, message)` record is yielded as soon as it is
+        complete, rather than buffering the full log in memory.
+        """
         args = [f"{tag}..HEAD"] if tag else []
+        proc = self.repo.git.log(
+            *args,
+            z=True,  # separate with \x00 rather than \n to differentiate multiline commits
+            format="%h:%H:%B",  # message only
+            as_process=True,
+        )
         try:
-            logs = self.repo.git.log(
-                *args,
-                z=True,  # separate with \x00 rather than \n to differentiate multiline commits
-                format="%h:%H:%B",  # message only
-            )
+            pending = b""
+            for chunk in iter(lambda: proc.stdout.read(LOG_CHUNK_SIZE), b""):
+                *records, pending = (pending + chunk).split(b"\x00")
+                for record in records:
+                    if record:
+                        yield _parse_log_record(record)
+            if pending.strip():
+                yield _parse_log_record(pending.rstrip(b"\n"))
+            proc.wait()
         except git.exc.GitCommandError as e:
             msg = (
                 "Unable to fetch commit logs."
@@ -92,7 +294,12 @@ class Git:
                 else "No commit logs available."
             )
             raise errors.VcsError(msg) from e
-        return [m.split(":", 2) for m in logs.split("\x00") if m]
+        finally:
+            # Stop `git log` if the consumer stops reading before the end of the log.
+            if proc.poll() is None:
+                proc.terminate()
+                proc.proc.wait()
+            proc.stdout.close()
 
     @timer
     def get_log(self: T, commit_hash: str) -> list:
@@ -114,53 +321,49 @@ class Git:
         return next(m.split(":", 2) for m in logs.split("\x00") if m)  # pragma: no cover
 
     @timer
-    def add_paths(self: T, paths: list[str]) -> None:
-        """Add path to git repository."""
-        if self.dry_run:
-            self.context.warning("  Would add paths '%s' to Git", "', '".join(paths))
-            return
-        self.repo.git.add(*paths)
+    def ls_files(self: T) -> list[str]:
+        """Paths of files tracked in the index, relative to the working tree."""
+        return [path for path in self.repo.git.ls_files("-z").split("\0") if path]
 
     @timer
-    def commit(self: T, current: str, new: str, tag: str, paths: list[str] | None = None) -> None:
-        """Commit changes to git repository."""
-        self.context.warning("Would prepare Git commit")
-        paths = paths or []
-
-        if paths:
-            self.add_paths(paths)
-
-        msg = [
-            f"Update CHANGELOG for {new}",
-            f"Bump version: {current} → {new}" if self._release else "",
-        ]
-
-        message = "\n".join(msg).strip()
-        if self.dry_run or not self._commit:
-            self.context.warning("  Would commit to Git with message '%s", message)
-            return
+    def _add_paths(self: T, paths: list[str]) -> None:
+        self.repo.git.add(*paths)
 
+    @timer
+    def _commit_changes(self: T, message: str) -> None:
         try:
             self.repo.git.commit(message=message)
         except git.GitCommandError as e:
             msg = f"Unable to commit: {e}"
             raise errors.VcsError(msg) from e
 
-        if not self._tag or not self._release:
-            self.context.warning("  Would tag with version '%s", tag)
-            return
-
+    @timer
+    def _create_tag(self: T, tag: str) -> None:
         try:
             self.repo.git.tag(tag)
         except git.GitCommandError as e:
-            self.revert()
             msg = f"Unable to tag: {e}"
             raise errors.VcsError(msg) from e
 
     @timer
-    def revert(self: T) -> None:
-        """Revert a commit."""
-        if self.dry_run:
-            self.context.warning("Would revert commit in Git")
-            return
+    def _reset(self: T) -> None:
         self.repo.git.reset("HEAD~1", hard=True)
+
+
+@timer
+def new_vcs(context: Context, **kwargs) -> BaseVcs:
+    """Generate a new vcs backend based on the configured `vcs_backend`."""
+    backend = context.config.vcs_backend
+    if backend == Git.name:
+        return Git(context, **kwargs)
+
+    if backend == "pygit2":
+        try:
+            from changelog_gen.vcs_pygit2 import Pygit2
+        except ModuleNotFoundError as e:
+            msg = "pygit2 required for pygit2 vcs backend, install with `--extras pygit2`."
+            raise errors.VcsError(msg) from e
+        return Pygit2(context, **kwargs)
+
+    msg = f'VCS backend "{backend}" not supported.'
+    raise errors.VcsError(msg)
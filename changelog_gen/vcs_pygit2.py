@@ -0,0 +1,157 @@
+"""VCS implementation using libgit2 bindings, avoiding a `git` subprocess per operation."""
+
+from __future__ import annotations
+
+import typing as t
+from pathlib import Path
+
+import pygit2
+
+from changelog_gen import errors
+from changelog_gen.util import timer
+from changelog_gen.vcs import TAG_PREFIX, BaseVcs
+
+if t.TYPE_CHECKING:
+    from changelog_gen.context import Context
+
+T = t.TypeVar("T", bound="Pygit2")
+
+
+class Pygit2(BaseVcs):
+    """VCS implementation for git repositories, using pygit2.
+
+    Git hooks (such as `pre-commit` or `commit-msg`) are not run when
+    committing through libgit2.
+    """
+
+    name = "pygit2"
+
+    @timer
+    def __init__(self: T, context: Context, **kwargs) -> None:
+        super().__init__(context, **kwargs)
+        path = pygit2.discover_repository(str(Path.cwd()))
+        repo = pygit2.Repository(path) if path is not None else None
+        # Paths are staged relative to the working tree, only run from its root as the git backend does.
+        if repo is None or repo.workdir is None or Path(repo.workdir).resolve() != Path.cwd().resolve():
+            msg = "No git repository found, please run git init."
+            raise errors.VcsError(msg)
+        self.repo = repo
+
+    @property
+    def git_dir(self: T) -> Path:
+        """Path to the repository git directory."""
+        return Path(self.repo.path)
+
+    @property
+    def work_tree(self: T) -> Path:
+        """Path to the repository working tree."""
+        return Path(self.repo.workdir)
+
+    @timer
+    def get_current_info(self: T) -> dict[str, str]:
+        """Get current state info from the repository."""
+        if self.repo.head_is_unborn:
+            msg = "Unable to determine repository status."
+            raise errors.VcsError(msg)
+
+        branch = self.repo.head.shorthand
+        remote = self.repo.branches.remote.get(f"origin/{branch}")
+        missing_local = missing_remote = False
+        if remote is None:
+            missing_remote = True
+        else:
+            ahead, behind = self.repo.ahead_behind(self.repo.head.target, remote.target)
+            missing_local = behind > 0
+            missing_remote = ahead > 0
+
+        dirty = bool(self.repo.status(untracked_files="no"))
+
+        return {
+            "missing_local": missing_local,
+            "missing_remote": missing_remote,
+            "dirty": dirty,
+            "branch": branch,
+        }
+
+    @timer
+    def tags(self: T) -> frozenset[str]:
+        """Fetch all tag names in the repository."""
+        return frozenset(ref[len(TAG_PREFIX) :] for ref in self.repo.references if ref.startswith(TAG_PREFIX))
+
+    @timer
+    def existing_tags(self: T, names: t.Iterable[str]) -> frozenset[str]:
+        """Filter tag names to those that exist in the repository, looking up only the named refs."""
+        return frozenset(name for name in names if f"{TAG_PREFIX}{name}" in self.repo.references)
+
+    def _log(self: T, commit: pygit2.Commit) -> tuple[str, str, str]:
+        return commit.short_id, str(commit.id), commit.message
+
+    def iter_logs(self: T, tag: str | None) -> t.Iterator[tuple[str, str, str]]:
+        """Stream `(short_hash, commit_hash, message)` logs since last tag."""
+        hide = None
+        if tag:
+            try:
+                hide = self.repo.revparse_single(f"{tag}^{{commit}}").id
+            except (KeyError, ValueError, pygit2.GitError) as e:
+                msg = "Unable to fetch commit logs."
+                raise errors.VcsError(msg) from e
+
+        if self.repo.head_is_unborn:
+            msg = "No commit logs available."
+            raise errors.VcsError(msg)
+
+        # Match `git log` ordering, newest first without showing parents before children.
+        walker = self.repo.walk(self.repo.head.target, pygit2.GIT_SORT_TOPOLOGICAL | pygit2.GIT_SORT_TIME)
+        if hide is not None:
+            walker.hide(hide)
+
+        for commit in walker:
+            yield self._log(commit)
+
+    @timer
+    def get_log(self: T, commit_hash: str) -> list:
+        """Fetch log from a commit hash."""
+        try:
+            commit = self.repo.revparse_single(f"{commit_hash}^{{commit}}")
+        except (KeyError, ValueError, pygit2.GitError) as e:
+            msg = "No commit log available."
+            raise errors.VcsError(msg) from e
+        return list(self._log(commit))
+
+    @timer
+    def ls_files(self: T) -> list[str]:
+        """Paths of files tracked in the index, relative to the working tree."""
+        return [entry.path for entry in self.repo.index]
+
+    @timer
+    def _add_paths(self: T, paths: list[str]) -> None:
+        self.repo.index.add_all(paths)
+        self.repo.index.write()
+
+    @timer
+    def _commit_changes(self: T, message: str) -> None:
+        head = self.repo.head.peel(pygit2.Commit)
+        tree = self.repo.index.write_tree()
+        if tree == head.tree_id:
+            msg = "Unable to commit: nothing to commit, working tree clean"
+            raise errors.VcsError(msg)
+
+        try:
+            signature = self.repo.default_signature
+        except (KeyError, pygit2.GitError) as e:
+            msg = f"Unable to commit: {e}"
+            raise errors.VcsError(msg) from e
+        self.repo.create_commit("HEAD", signature, signature, f"{message}\n", tree, [head.id])
+
+    @timer
+    def _create_tag(self: T, tag: str) -> None:
+        try:
+            self.repo.references.create(f"{TAG_PREFIX}{tag}", self.repo.head.target)
+        except (ValueError, pygit2.GitError) as e:
+            msg = f"Unable to tag: {e}"
+            raise errors.VcsError(msg) from e
+
+    @timer
+    def _reset(self: T) -> None:
+        head = self.repo.head.peel(pygit2.Commit)
+        self.repo.reset(head.parent_ids[0], pygit2.GIT_RESET_HARD)
@@ -1,38 +1,76 @@
 from __future__ import annotations
 
+import contextlib
 import logging
+import mmap
+import os
+import re
+import shutil
 import typing as t
-from dataclasses import dataclass
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from tempfile import NamedTemporaryFile
 
 from changelog_gen import errors, parse
-from changelog_gen.util import timer
+from changelog_gen.discovery import FileDiscovery
+from changelog_gen.util import span, timer
 
 if t.TYPE_CHECKING:
     from changelog_gen.config import Config
+    from changelog_gen.vcs import BaseVcs
 
 logger = logging.getLogger(__name__)
 
 T = t.TypeVar("T", bound="BumpVersion")
 
 
+# Files at least this size are scanned through a memory map rather than read into memory.
+MMAP_THRESHOLD = 1024 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class Edit:
+    """Replacement of search bytes found at an offset in a file."""
+
+    offset: int
+    search: bytes
+    replace: bytes
+
+
 @dataclass
 class ModifyFile:
-    """Configured file for modification."""
+    """Configured file for modification.
+
+    Optional patterns, from glob and directory entries, may match nothing in
+    the file, a file where no pattern matches is skipped.
+    """
 
     filename: str
     path: Path
     patterns: list[str]
+    optional: set[str] = field(default_factory=set)
+    hits: Counter = field(default_factory=Counter, init=False, repr=False, compare=False)
+
+    @property
+    def matched(self: t.Self) -> bool:
+        """Any pattern matched when the file was last updated."""
+        return any(self.hits.values())
 
-    def update(self: t.Self, current: str, new: str, *, dry_run: bool) -> tuple[Path, Path]:
-        """Update file with configured patterns."""
+    def read(self: t.Self) -> str:
+        """Read current file contents, preserving line endings."""
         try:
-            with self.path.open("r") as f:
-                contents = f.read()
+            with self.path.open("r", newline="") as f:
+                return f.read()
         except FileNotFoundError as e:
             msg = f"Configured file not found '{self.filename}'."
             raise errors.VersionError(msg) from e
 
+    def _replacements(self: t.Self, current: str, new: str) -> list[tuple[str, str, str]]:
+        """Generate `(pattern, search, replace)` for each configured pattern."""
+        replacements = []
         for pattern in self.patterns:
             try:
                 search, replace = pattern.format(version=current), pattern.format(version=new)
@@ -44,27 +82,273 @@ class ModifyFile:
                 msg = f"Pattern '{pattern}' generated no change for '{self.filename}'."
                 raise errors.VersionError(msg)
 
-            new_contents = contents.replace(search, replace)
-            if new_contents == contents:
+            replacements.append((pattern, search, replace))
+        return replacements
+
+    def _check_hits(self: t.Self, replacements: list[tuple[str, str, str]], hits: Counter) -> None:
+        for pattern, search, _ in replacements:
+            logger.debug("Pattern '%s' matched %d times in '%s'.", pattern, hits[search], self.filename)
+            self.hits[pattern] = hits[search]
+            if not hits[search] and pattern not in self.optional:
                 msg = f"No change for '{self.filename}', ensure pattern '{pattern}' is correct."
                 raise errors.VersionError(msg)
-            contents = new_contents
+        if not self.matched:
+            logger.debug("No patterns matched in '%s', skipping.", self.filename)
+
+    def update(self: t.Self, contents: str, current: str, new: str) -> str:
+        """Apply configured patterns to file contents.
+
+        All patterns are substituted in a single scan, where patterns overlap
+        the longest match wins.
+        """
+        replacements = self._replacements(current, new)
+        if not replacements:
+            return contents
 
-        backup = Path(f"{self.path}.bak")
-        if not dry_run:
-            with backup.open("w") as f:
-                f.write(contents)
+        lookup = {search: replace for _, search, replace in replacements}
+        matcher = re.compile("|".join(re.escape(search) for search in sorted(lookup, key=len, reverse=True)))
+        hits = Counter()
+
+        def substitute(match: re.Match) -> str:
+            hits[match[0]] += 1
+            return lookup[match[0]]
+
+        contents = matcher.sub(substitute, contents)
+        self._check_hits(replacements, hits)
+
+        return contents
+
+    def find(self: t.Self, contents: mmap.mmap, current: str, new: str) -> list[Edit]:
+        """Locate configured patterns in mapped file contents.
+
+        Matches are resolved as in `update`, leftmost first, preferring the
+        longest where patterns overlap.
+        """
+        replacements = self._replacements(current, new)
+        lookup = {search.encode(): (search, replace.encode()) for _, search, replace in replacements}
+
+        candidates = []
+        for search in lookup:
+            offset = contents.find(search)
+            while offset != -1:
+                candidates.append((offset, -len(search), search))
+                offset = contents.find(search, offset + 1)
+        candidates.sort()
+
+        edits, end, hits = [], 0, Counter()
+        for offset, _, search in candidates:
+            if offset < end:
+                continue
+            key, replace = lookup[search]
+            edits.append(Edit(offset, search, replace))
+            hits[key] += 1
+            end = offset + len(search)
+        self._check_hits(replacements, hits)
+
+        return edits
+
+    def stage(self: t.Self, current: str, new: str, *, dry_run: bool) -> StagedChange | None:
+        """Validate and stage changes to the file, nothing is staged in a dry run."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError as e:
+            msg = f"Configured file not found '{self.filename}'."
+            raise errors.VersionError(msg) from e
+
+        if size < MMAP_THRESHOLD:
+            original = self.read()
+            contents = self.update(original, current, new)
+            if dry_run or not self.matched:
+                return None
+            return StagedFile(self.path, _stage(self.path, contents), original)
+
+        with self.path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+            edits = self.find(contents, current, new)
+            if dry_run or not self.matched:
+                return None
+            if all(len(edit.search) == len(edit.replace) for edit in edits):
+                return PatchedFile(self.path, edits)
+            return RewrittenFile(self.path, _stage_edits(self.path, contents, edits), edits)
+
+
+def _stage(path: Path, contents: str) -> Path:
+    """Write contents to a temporary file next to path, synced to disk."""
+    with NamedTemporaryFile("w", dir=path.parent, prefix=f".{path.name}.", newline="", delete=False) as f:
+        try:
+            f.write(contents)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            Path(f.name).unlink()
+            raise
+    shutil.copymode(path, f.name)
+    return Path(f.name)
+
+
+def _stage_edits(path: Path, contents: mmap.mmap, edits: list[Edit]) -> Path:
+    """Write mapped contents with edits applied to a temporary file next to path, synced to disk."""
+    with NamedTemporaryFile("wb", dir=path.parent, prefix=f".{path.name}.", delete=False) as f:
+        try:
+            position = 0
+            for edit in [*edits, Edit(len(contents), b"", b"")]:
+                for start in range(position, edit.offset, COPY_CHUNK_SIZE):
+                    f.write(contents[start : min(start + COPY_CHUNK_SIZE, edit.offset)])
+                f.write(edit.replace)
+                position = edit.offset + len(edit.search)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            Path(f.name).unlink()
+            raise
+    shutil.copymode(path, f.name)
+    return Path(f.name)
+
+
+def _inverse(edits: list[Edit]) -> list[Edit]:
+    """Edits reverting `edits`, with offsets into the edited contents."""
+    inverse, shift = [], 0
+    for edit in edits:
+        inverse.append(Edit(edit.offset + shift, edit.replace, edit.search))
+        shift += len(edit.replace) - len(edit.search)
+    return inverse
+
+
+def _patch(path: Path, edits: list[Edit]) -> None:
+    """Overwrite equal length edits in place, synced to disk."""
+    with path.open("r+b") as f, mmap.mmap(f.fileno(), 0) as contents:
+        for edit in edits:
+            contents[edit.offset : edit.offset + len(edit.replace)] = edit.replace
+        contents.flush()
+
+
+@dataclass
+class StagedFile:
+    """New contents for a file, written alongside it ready to swap in."""
+
+    path: Path
+    staged: Path
+    original: str
 
-        return (self.path, backup)
+    def commit(self: t.Self) -> None:
+        """Swap the staged contents in."""
+        self.staged.replace(self.path)
+
+    def discard(self: t.Self) -> None:
+        """Remove the staged contents, if not swapped in."""
+        self.staged.unlink(missing_ok=True)
+
+    def rollback(self: t.Self) -> None:
+        """Restore the original contents, if swapped in."""
+        if not self.staged.exists():
+            self._restore().replace(self.path)
+
+    def _restore(self: t.Self) -> Path:
+        return _stage(self.path, self.original)
+
+
+@dataclass
+class RewrittenFile(StagedFile):
+    """Staged contents of a large file, restored by reverting its edits."""
+
+    original: list[Edit]
+
+    def _restore(self: t.Self) -> Path:
+        with self.path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+            return _stage_edits(self.path, contents, _inverse(self.original))
+
+
+@dataclass
+class PatchedFile:
+    """Equal length edits to a large file, patched in place on commit.
+
+    Patching in place avoids rewriting the file, but unlike a rename is not
+    atomic, an interrupted patch is reverted by rolling back.
+    """
+
+    path: Path
+    edits: list[Edit]
+
+    def commit(self: t.Self) -> None:
+        """Patch edits into the file."""
+        _patch(self.path, self.edits)
+
+    def discard(self: t.Self) -> None:
+        """Nothing is staged ahead of patching."""
+
+    def rollback(self: t.Self) -> None:
+        """Patch the original bytes back into the file."""
+        _patch(self.path, _inverse(self.edits))
+
+
+StagedChange = t.Union[StagedFile, PatchedFile]
+
+
+class Transaction:
+    """Replace a set of files all or nothing.
+
+    New contents are staged next to each file and synced before any file is
+    touched, then renamed over the originals (or patched in place for equal
+    length edits to large files). If a change fails, changes already applied
+    are rolled back.
+    """
+
+    def __init__(self: t.Self) -> None:
+        self.changes: list[StagedChange] = []
+
+    def add(self: t.Self, change: StagedChange) -> None:
+        """Add a staged change to the transaction."""
+        self.changes.append(change)
+
+    def discard(self: t.Self) -> None:
+        """Remove any staged files that have not been applied."""
+        for change in self.changes:
+            change.discard()
+
+    def commit(self: t.Self) -> None:
+        """Apply all staged changes, rolling back on failure."""
+        applied = []
+        try:
+            for change in self.changes:
+                applied.append(change)
+                change.commit()
+        except BaseException:
+            for change in reversed(applied):
+                change.rollback()
+            self.discard()
+            raise
+
+        self._sync_dirs()
+
+    def _sync_dirs(self: t.Self) -> None:
+        # Persist the renames, directories can't be opened for syncing on all platforms.
+        for directory in {change.path.parent for change in self.changes}:
+            with contextlib.suppress(OSError):
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
 
 
 class BumpVersion:  # noqa: D101
     @timer
-    def __init__(self: T, cfg: Config, new: str = "", *, allow_dirty: bool = False, dry_run: bool = False) -> None:
+    def __init__(
+        self: T,
+        cfg: Config,
+        new: str = "",
+        *,
+        allow_dirty: bool = False,
+        dry_run: bool = False,
+        git: BaseVcs | None = None,
+    ) -> None:
         self.allow_dirty = allow_dirty
         self.dry_run = dry_run
         self.config = cfg
         self.new = new
+        # Required to expand glob and directory `files` entries.
+        self.git = git
 
     @timer
     def get_version_info(self: T, semver: str) -> dict[str, str]:
@@ -92,24 +376,81 @@ class BumpVersion:  # noqa: D101
         files_to_modify = {
             "pyproject.toml": ModifyFile("pyproject.toml", cwd / "pyproject.toml", ['current_version = "{version}"']),
         }
-        for file in self.config.files:
+        files = self.config.files
+        if self.git is not None:
+            files = FileDiscovery(self.git, cwd).expand(files)
+        for file in files:
             mf = files_to_modify.get(file["filename"], ModifyFile(file["filename"], cwd / file["filename"], []))
-            mf.patterns.append(file.get("pattern", "{version}"))
+            pattern = file.get("pattern", "{version}")
+            # Patterns from expanded entries may not match every file, unless also configured for the file directly.
+            if "expanded_from" not in file:
+                mf.optional.discard(pattern)
+            elif pattern not in mf.patterns:
+                mf.optional.add(pattern)
+            mf.patterns.append(pattern)
             files_to_modify[file["filename"]] = mf
 
-        modified_files = []
-        for file in files_to_modify.values():
+        transaction = Transaction()
+        if self.config.replace_workers > 1:
+            self._stage_parallel(transaction, list(files_to_modify.values()), version)
+        else:
             try:
-                modified_files.append(file.update(self.config.current_version, version, dry_run=self.dry_run))
-            except Exception:  # noqa: PERF203
-                if not self.dry_run:
-                    for _original, backup in modified_files:
-                        backup.unlink()
+                for file in files_to_modify.values():
+                    change = self._stage(file, version)
+                    if change is not None:
+                        transaction.add(change)
+            except BaseException:
+                transaction.discard()
                 raise
 
-        if not self.dry_run:
-            for original, backup in modified_files:
-                original.write_text(backup.read_text())
-                backup.unlink()
+        try:
+            _check_expanded(files, files_to_modify)
+        except errors.VersionError:
+            transaction.discard()
+            raise
+
+        transaction.commit()
+
+        return sorted({mf.filename for mf in files_to_modify.values() if mf.matched})
+
+    def _stage(self: T, file: ModifyFile, version: str) -> StagedChange | None:
+        return span(
+            f"{__name__}.ModifyFile.stage[{file.filename}]",
+            file.stage,
+            self.config.current_version,
+            version,
+            dry_run=self.dry_run,
+        )
+
+    def _stage_parallel(self: T, transaction: Transaction, files: list[ModifyFile], version: str) -> None:
+        """Stage files across a pool of threads, all files are staged or none are."""
+        with ThreadPoolExecutor(self.config.replace_workers) as pool:
+            futures = [pool.submit(self._stage, file, version) for file in files]
+
+        error = None
+        for future in futures:
+            try:
+                change = future.result()
+            except BaseException as e:  # noqa: BLE001
+                error = error or e
+                continue
+            if change is not None:
+                transaction.add(change)
+
+        if error is not None:
+            transaction.discard()
+            raise error
+
+
+def _check_expanded(files: list[dict], files_to_modify: dict[str, ModifyFile]) -> None:
+    """Ensure each expanded entry pattern matched in at least one of its files."""
+    hits = Counter()
+    for file in files:
+        if "expanded_from" in file:
+            pattern = file.get("pattern", "{version}")
+            hits[file["expanded_from"], pattern] += files_to_modify[file["filename"]].hits[pattern]
 
-        return sorted({mf.filename for mf in files_to_modify.values()})
+    for (filename, pattern), count in hits.items():
+        if not count:
+            msg = f"No change for '{filename}', ensure pattern '{pattern}' is correct."
+            raise errors.VersionError(msg)
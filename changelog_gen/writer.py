@@ -2,21 +2,53 @@
 
 from __future__ import annotations
 
+import difflib
+import functools
+import hashlib
+import io
+import itertools
+import json
+import os
 import re
+import shutil
 import typing as t
-from collections import defaultdict
+from collections import defaultdict, deque
 from enum import Enum
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 
-from jinja2 import BaseLoader, Environment
-
 from changelog_gen.util import timer
 
 if t.TYPE_CHECKING:
+    from typing import BinaryIO
+
+    from jinja2 import Environment, Template
+
     from changelog_gen.context import Context
     from changelog_gen.extractor import Change
 
+# Size of reads when copying existing entries into a rewritten changelog.
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Increment when the release section index format changes to force a rebuild.
+INDEX_VERSION = 1
+
+
+class _Validation:
+    """Output sink recording the size and checksum of written content, discarding the content."""
+
+    def __init__(self: t.Self) -> None:
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def write(self: t.Self, data: bytes) -> int:
+        self.size += len(data)
+        self._hash.update(data)
+        return len(data)
+
+    def hexdigest(self: t.Self) -> str:
+        return self._hash.hexdigest()
+
 
 class Extension(Enum):
     """Supported changelog file extensions."""
@@ -30,15 +62,33 @@ def regex_replace(value: str, target: str, replace: str) -> str:
     return re.sub(target, replace, value)
 
 
+@functools.cache
+def _environment() -> Environment:
+    """Return the shared jinja environment used to compile templates."""
+    from jinja2 import BaseLoader, Environment
+
+    env = Environment(loader=BaseLoader())  # noqa: S701
+    env.filters["regex_replace"] = regex_replace
+    return env
+
+
+@functools.lru_cache(maxsize=64)
+def compile_template(source: str) -> Template:
+    """Compile a jinja template, cached by template source."""
+    return _environment().from_string(source)
+
+
 class BaseWriter:
     """Base implementation for a changelog file writer."""
 
     file_header_line_count = 0
     file_header = None
     extension = None
+    default_change_template = None
+    default_release_template = None
 
     @timer
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self: t.Self,
         changelog: Path,
         context: Context,
@@ -46,30 +96,31 @@ class BaseWriter:
         release_template: str | None = None,
         *,
         dry_run: bool = False,
+        show_diff: bool = False,
     ) -> None:
         self.context = context
-        self.existing = []
         self.changelog = changelog
-        if self.changelog.exists():
-            lines = changelog.read_text().split("\n")
-            self.existing = lines[self.file_header_line_count + 1 :]
         self.content = []
         self.dry_run = dry_run
-        self._change_template = change_template
-        self._release_template = release_template
+        self.show_diff = show_diff
+        self.commits = []
+        self._change_template = change_template or self.default_change_template
+        self._release_template = release_template or self.default_release_template
+        # Change templates are written across lines for readability, but render a single line.
+        self._change_source = self._change_template.replace("\n", "") if self._change_template is not None else None
+
+    @functools.cached_property
+    def _change_compiled(self: t.Self) -> Template:
+        return compile_template(self._change_source)
 
     @timer
     def _render_change(self: t.Self, change: Change) -> str:
-        env = Environment(loader=BaseLoader())  # noqa: S701
-
-        env.filters["regex_replace"] = regex_replace
-        ctemplate = env.from_string(self._change_template.replace("\n", ""))
-
-        return ctemplate.render(change=change)
+        return self._change_compiled.render(change=change)
 
     @timer
     def consume(self: t.Self, version_string: str, type_headers: dict[str, str], changes: list[Change]) -> None:
         """Process sections and generate changelog file entries."""
+        self.commits = [change.commit_hash for change in changes if change.commit_hash]
         grouped_changes = defaultdict(list)
         for change in changes:
             change.rendered = self._render_change(change)
@@ -96,21 +147,305 @@ class BaseWriter:
 
     @timer
     def write(self: t.Self) -> str:
-        """Write file contents to destination."""
-        self.content = [self.file_header, *self.content, *self.existing]
-        self._write(self.content)
+        """Write new entries ahead of existing entries in the destination."""
+        self._write([self.file_header, *self.content])
 
         return str(self.changelog)
 
+    def _trailer(self: t.Self) -> list[str]:
+        """Lines to write after existing entries."""
+        return []
+
+    @timer
+    def _stream(self: t.Self, output: BinaryIO, content: list[str]) -> int | None:
+        """Write content, followed by existing entries copied in chunks, and the trailer.
+
+        Return the distance existing entries moved, or None if there were no existing entries.
+        """
+        prefix = "\n".join(content).encode("utf-8")
+        output.write(prefix)
+
+        shift = None
+        if self.changelog.exists():
+            with self.changelog.open("rb") as existing:
+                # Skip the file header, and the blank line following it.
+                for _ in range(self.file_header_line_count + 1):
+                    line = existing.readline()
+                if line.endswith(b"\n"):
+                    shift = len(prefix) + 1 - existing.tell()
+                    output.write(b"\n")
+                    shutil.copyfileobj(existing, output, COPY_CHUNK_SIZE)
+
+        trailer = self._trailer()
+        if trailer:
+            output.write(("\n" + "\n".join(trailer)).encode("utf-8"))
+
+        return shift
+
+    def _release_title(self: t.Self, line: str, next_line: str) -> str | None:
+        """Return the release title if line starts a release section."""
+        raise NotImplementedError
+
+    @property
+    def index_path(self: t.Self) -> Path:
+        """Sidecar file storing the release section index."""
+        return self.changelog.with_name(f".{self.changelog.name}.index.json")
+
+    def _scan(self: t.Self, data: t.Iterable[bytes], start: int = 0) -> list[dict]:
+        """Find release sections in changelog lines, with offsets relative to start."""
+        sections = []
+        offset, previous = start, None
+        for line in data:
+            if previous is not None:
+                title = self._release_title(previous[1].decode("utf-8"), line.decode("utf-8"))
+                if title is not None:
+                    sections.append({"version": title.split()[0], "title": title, "offset": previous[0]})
+            previous = (offset, line)
+            offset += len(line)
+        if previous is not None:
+            title = self._release_title(previous[1].decode("utf-8"), "")
+            if title is not None:
+                sections.append({"version": title.split()[0], "title": title, "offset": previous[0]})
+        return sections
+
+    def _stat(self: t.Self) -> dict:
+        stat = self.changelog.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _load_index(self: t.Self) -> dict | None:
+        try:
+            index = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return None
+        return index if index.get("version") == INDEX_VERSION else None
+
+    def _index_is_current(self: t.Self, index: dict | None) -> bool:
+        """Check the index was generated for the changelog as it is on disk."""
+        if index is None or not self.changelog.exists():
+            return False
+        return {"size": index.get("size"), "mtime_ns": index.get("mtime_ns")} == self._stat()
+
+    def _save_index(self: t.Self, sections: list[dict]) -> list[dict]:
+        """Calculate section lengths from offsets and store the index."""
+        stat = self._stat()
+        sections = sorted(sections, key=lambda section: section["offset"])
+        for section, end in zip(sections, [s["offset"] for s in sections[1:]] + [stat["size"]]):
+            section["length"] = end - section["offset"]
+            section.setdefault("commits", [])
+        self.index_path.write_text(json.dumps({"version": INDEX_VERSION, **stat, "sections": sections}))
+        return sections
+
+    @timer
+    def _rebuild_index(self: t.Self, commits: dict[str, list[str]]) -> list[dict]:
+        """Index release sections by reading the full changelog, with known commits per version."""
+        with self.changelog.open("rb") as f:
+            header = b"".join(f.readline() for _ in range(self.file_header_line_count))
+            sections = self._scan(f, len(header))
+        for section in sections:
+            section["commits"] = commits.get(section["version"], [])
+        return self._save_index(sections)
+
+    @timer
+    def sections(self: t.Self) -> list[dict]:
+        """Release sections in the changelog, with byte offset, length and commit hashes.
+
+        Loaded from the sidecar index if it matches the changelog, otherwise
+        rebuilt by reading the changelog.
+        """
+        if not self.changelog.exists():
+            return []
+        index = self._load_index()
+        if self._index_is_current(index):
+            return index["sections"]
+        return self._rebuild_index(_known_commits(index))
+
+    @timer
+    def _update_index(
+        self: t.Self,
+        index: dict | None,
+        content: list[str],
+        shift: int | None,
+        *,
+        current: bool,
+    ) -> None:
+        """Update the index after new entries have been written ahead of existing entries.
+
+        Existing sections are moved by the size of the new entries, only the new
+        entries are scanned for release sections. If the index was out of date
+        before writing, the full changelog is indexed again.
+        """
+        lines = "\n".join(content).encode("utf-8").splitlines(keepends=True)
+        start = sum(len(line) for line in lines[: self.file_header_line_count])
+        sections = self._scan(lines[self.file_header_line_count :], start)
+        if sections:
+            sections[0]["commits"] = self.commits
+
+        if not current:
+            self._rebuild_index({**_known_commits(index), **{s["version"]: s["commits"] for s in sections}})
+            return
+
+        if shift is not None:
+            sections.extend({**s, "offset": s["offset"] + shift} for s in index["sections"])
+        self._save_index(sections)
+
+    @timer
+    def show(self: t.Self, version: str, candidates: t.Iterable[str] = ()) -> str | None:
+        """Read a single release section, seeking directly to it using the index."""
+        versions = {version, *candidates}
+        section = next((s for s in self.sections() if s["version"] in versions), None)
+        if section is None:
+            return None
+        with self.changelog.open("rb") as f:
+            f.seek(section["offset"])
+            return f.read(section["length"]).decode("utf-8")
+
+    @timer
+    def diff(self: t.Self, content: list[str], context: int = 3) -> str:
+        """Generate a unified diff of the regions of the changelog changed by writing content.
+
+        Existing entries are unchanged, only the header region, where new
+        entries are inserted, and the end of the changelog, where any trailer
+        is appended, are compared with `context` lines of existing entries
+        around them. Compared lines are the bytes written by `_stream`.
+        """
+        prefix = "\n".join(content).encode("utf-8")
+        trailer = self._trailer()
+        suffix = ("\n" + "\n".join(trailer)).encode("utf-8") if trailer else b""
+
+        name = self.changelog.name
+        hunks = []
+        if not self.changelog.exists():
+            hunks.extend(_hunks([], _lines(prefix + suffix), context))
+        else:
+            with self.changelog.open("rb") as existing:
+                header = [existing.readline() for _ in range(self.file_header_line_count + 1)]
+                if not header[-1].endswith(b"\n"):
+                    # Without existing entries the changelog is replaced entirely.
+                    hunks.extend(_hunks(_lines(b"".join(header)), _lines(prefix + suffix), context))
+                    return _format_diff(name, hunks)
+
+                new_header = _lines(prefix + b"\n")
+                lead = list(itertools.islice(existing, 2 * context))
+                # Only the last lines are needed to diff the trailer, the rest are counted without holding them.
+                tail, skipped = deque(maxlen=context), 0
+                if suffix:
+                    for line in existing:
+                        tail.append(line)
+                        skipped += 1
+
+            if skipped <= context:
+                rest = lead + list(tail)
+                hunks.extend(_hunks(header + rest, new_header + _lines(b"".join(rest) + suffix), context))
+            else:
+                hunks.extend(_hunks(header + lead, new_header + lead, context))
+                old_start = len(header) + len(lead) + skipped - len(tail)
+                new_start = old_start + len(new_header) - len(header)
+                hunks.extend(
+                    _hunks(list(tail), _lines(b"".join(tail) + suffix), context, old_start, new_start),
+                )
+        return _format_diff(name, hunks)
+
     @timer
     def _write(self: t.Self, content: list[str]) -> None:
         if self.dry_run:
-            self.context.warning("Would write to '%s'", self.changelog.name)
-            with NamedTemporaryFile("wb") as output_file:
-                output_file.write(("\n".join(content)).encode("utf-8"))
+            # Validate the write without writing anything, recording what would be written.
+            validation = _Validation()
+            self._stream(validation, content)
+            self.context.warning(
+                "Would write %d bytes to '%s' (sha256 %s)",
+                validation.size,
+                self.changelog.name,
+                validation.hexdigest(),
+            )
+            if self.show_diff:
+                self.context.error(self.diff(content).replace("%", "%%"))
+            return
+
+        self.context.warning("Writing to '%s'", self.changelog.name)
+        index = self._load_index()
+        current = self._index_is_current(index)
+        # Write alongside the changelog and rename over it, the changelog is never partially written.
+        # Resolve symlinks so a linked changelog is updated rather than replaced with a regular file.
+        target = self.changelog.resolve()
+        with NamedTemporaryFile("wb", dir=target.parent, prefix=f".{target.name}.", delete=False) as f:
+            try:
+                shift = self._stream(f, content)
+            except BaseException:
+                f.close()
+                Path(f.name).unlink()
+                raise
+        if target.exists():
+            shutil.copymode(target, f.name)
         else:
-            self.context.warning("Writing to '%s'", self.changelog.name)
-            self.changelog.write_text("\n".join(content))
+            # Temporary files are private, create the changelog as a regular file would be.
+            Path(f.name).chmod(0o666 & ~_umask())
+        Path(f.name).replace(target)
+
+        try:
+            self._update_index(index, content, shift, current=current)
+        except OSError as e:
+            self.context.warning("Unable to update '%s': %s", self.index_path.name, e)
+
+
+def _lines(data: bytes) -> list[bytes]:
+    """Split data into lines the way they are read from a file, keeping line endings."""
+    return io.BytesIO(data).readlines()
+
+
+def _range(start: int, stop: int) -> str:
+    """Format a unified diff hunk range from zero based line offsets."""
+    length = stop - start
+    if length == 1:
+        return str(start + 1)
+    return f"{start + 1 if length else start},{length}"
+
+
+def _hunks(
+    old: list[bytes],
+    new: list[bytes],
+    context: int,
+    old_start: int = 0,
+    new_start: int = 0,
+) -> t.Iterator[str]:
+    """Unified diff hunks between lines, numbered from the lines preceding them."""
+    for group in difflib.SequenceMatcher(None, old, new, autojunk=False).get_grouped_opcodes(context):
+        old_range = _range(old_start + group[0][1], old_start + group[-1][2])
+        new_range = _range(new_start + group[0][3], new_start + group[-1][4])
+        yield f"@@ -{old_range} +{new_range} @@"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                yield from _diff_lines(" ", old[i1:i2])
+                continue
+            yield from _diff_lines("-", old[i1:i2])
+            yield from _diff_lines("+", new[j1:j2])
+
+
+def _diff_lines(marker: str, lines: list[bytes]) -> t.Iterator[str]:
+    for line in lines:
+        text = line.decode("utf-8")
+        if text.endswith("\n"):
+            yield f"{marker}{text[:-1]}"
+        else:
+            yield f"{marker}{text}"
+            yield "\\ No newline at end of file"
+
+
+def _format_diff(name: str, hunks: list[str]) -> str:
+    if not hunks:
+        return ""
+    return "\n".join([f"--- a/{name}", f"+++ b/{name}", *hunks])
+
+
+def _umask() -> int:
+    """Current process umask, which can only be read by setting it."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def _known_commits(index: dict | None) -> dict[str, list[str]]:
+    """Commit hashes per release version from an existing index."""
+    return {section["version"]: section["commits"] for section in index["sections"]} if index else {}
 
 
 class MdWriter(BaseWriter):
@@ -120,22 +455,14 @@ class MdWriter(BaseWriter):
     file_header = "# Changelog\n"
     extension = Extension.MD
 
-    @timer
-    def __init__(self: t.Self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
-        self._change_template = (
-            self._change_template
-            or """
+    default_change_template = """
 -{% if change.scope %} (`{{change.scope}}`){% endif %}
 {% if change.breaking %} **Breaking**{% endif %}
  {{ change.description }}
 {% for footer in change.footers %}{% if footer.footer == "Authors"%} {{footer.value}}{% endif %}{% endfor %}
 {% for link in change.links %} [[{{ link.text }}]({{ link.link }})]{% endfor %}
 """
-        )
-        self._release_template = (
-            self._release_template
-            or """## {{ version_string }}
+    default_release_template = """## {{ version_string }}
 
 {% for header, changes in group_changes.items() -%}
 ### {{ header }}
@@ -145,18 +472,20 @@ class MdWriter(BaseWriter):
 {% endfor %}
 {% endfor %}
 """
-        )
 
     @timer
     def _consume(self: t.Self, version_string: str, group_changes: dict[str, list[Change]]) -> None:
-        env = Environment(loader=BaseLoader())  # noqa: S701
-
-        env.filters["regex_replace"] = regex_replace
-        rtemplate = env.from_string(self._release_template)
+        rtemplate = compile_template(self._release_template)
 
         content = rtemplate.render(group_changes=group_changes, version_string=version_string)
         self.content = content.split("\n")[:-1]
 
+    def _release_title(self: t.Self, line: str, next_line: str) -> str | None:  # noqa: ARG002
+        """Release sections start with a `## <version>` heading."""
+        if line.startswith("## ") and line[3:].strip():
+            return line[3:].strip()
+        return None
+
 
 class RstWriter(BaseWriter):
     """RST writer implementation."""
@@ -165,22 +494,14 @@ class RstWriter(BaseWriter):
     file_header = "=========\nChangelog\n=========\n"
     extension = Extension.RST
 
-    @timer
-    def __init__(self: t.Self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
-        self._change_template = (
-            self._change_template
-            or """
+    default_change_template = """
 *{% if change.scope %} (`{{change.scope}}`){% endif %}
 {% if change.breaking %} **Breaking**{% endif %}
  {{ change.description }}
 {% for footer in change.footers %}{% if footer.footer == "Authors"%} {{footer.value}}{% endif %}{% endfor %}
 {% for link in change.links %} [`{{ link.text }}`_]{% endfor %}
 """
-        )
-        self._release_template = (
-            self._release_template
-            or """{{ version_string }}
+    default_release_template = """{{ version_string }}
 {{ "=" * version_string|length }}
 
 {% for header, changes in group_changes.items() -%}
@@ -193,7 +514,10 @@ class RstWriter(BaseWriter):
 {% endfor %}
 {% endfor %}
 """
-        )
+
+    @timer
+    def __init__(self: t.Self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
         self._links = {}
 
     @timer
@@ -208,14 +532,18 @@ class RstWriter(BaseWriter):
 
     @timer
     def _consume(self: t.Self, version_string: str, group_changes: dict[str, list[Change]]) -> None:
-        env = Environment(loader=BaseLoader())  # noqa: S701
-
-        env.filters["regex_replace"] = regex_replace
-        rtemplate = env.from_string(self._release_template)
+        rtemplate = compile_template(self._release_template)
 
         content = rtemplate.render(group_changes=group_changes, version_string=version_string)
         self.content = content.split("\n")[:-2]
 
+    def _release_title(self: t.Self, line: str, next_line: str) -> str | None:
+        """Release sections start with a title underlined with `=`."""
+        title, underline = line.strip(), next_line.strip()
+        if title and underline and set(underline) == {"="} and len(underline) >= len(title):
+            return title
+        return None
+
     @timer
     def _render_change(self: t.Self, change: Change) -> str:
         line = super()._render_change(change)
@@ -225,12 +553,9 @@ class RstWriter(BaseWriter):
 
         return line
 
-    @timer
-    def write(self: t.Self) -> str:
-        """Write contents to destination."""
-        self.content = [self.file_header, *self.content, *self.existing, *self.links]
-        self._write(self.content)
-        return str(self.changelog)
+    def _trailer(self: t.Self) -> list[str]:
+        """Write links after existing entries."""
+        return self.links
 
 
 @timer
@@ -240,14 +565,15 @@ def new_writer(
     change_template: str | None = None,
     *,
     dry_run: bool = False,
+    show_diff: bool = False,
 ) -> BaseWriter:
     """Generate a new writer based on the required extension."""
     changelog = Path(f"CHANGELOG.{extension.value}")
 
     if extension == Extension.MD:
-        return MdWriter(changelog, context, dry_run=dry_run, change_template=change_template)
+        return MdWriter(changelog, context, dry_run=dry_run, show_diff=show_diff, change_template=change_template)
     if extension == Extension.RST:
-        return RstWriter(changelog, context, dry_run=dry_run, change_template=change_template)
+        return RstWriter(changelog, context, dry_run=dry_run, show_diff=show_diff, change_template=change_template)
 
     msg = f'Changelog extension "{extension.value}" not supported.'
     raise ValueError(msg)
@@ -18,7 +18,12 @@ minor_regex = 'feat'
 parser = '(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)'
 strict = false
 pre_release = false
+replace_workers = 1
+vcs_backend = 'git'
 version_string = 'v{new_version}'
+commit_cache = false
+commit_cache_size = 10000
+parse_workers = 1
 allowed_branches = []
 commit_types = [
     'feat',
@@ -73,6 +78,12 @@ def test_post_process_config_displayed(cli_runner, config_factory):
 verb = 'POST'
 body_template = '{"body": "Released on {{ version }}"}'
 auth_type = 'basic'
+concurrency = 1
+timeout = 5.0
+http2 = false
+max_attempts = 1
+backoff_factor = 0.5
+backoff_max = 30.0
 
 [post_process.link_generator]
 target = 'Refs'
@@ -1,3 +1,4 @@
+import sys
 from unittest import mock
 
 import pytest
@@ -32,10 +33,10 @@ def mock_git(monkeypatch):
         "dirty": False,
         "branch": "main",
     }
-    mock_git.get_logs.return_value = []
+    mock_git.iter_logs.return_value = []
     mock_git.find_tag.return_value = "v0.0.0"
 
-    monkeypatch.setattr(command, "Git", mock.Mock(return_value=mock_git))
+    monkeypatch.setattr("changelog_gen.vcs.new_vcs", mock.Mock(return_value=mock_git))
 
     return mock_git
 
@@ -70,7 +71,7 @@ def changelog(cwd):
 @pytest.fixture
 def commit_factory(mock_git):
     def factory(commits):
-        mock_git.get_logs.return_value = [
+        mock_git.iter_logs.return_value = [
             (f"short{i}", f"commit-hash{i}", message) for i, message in enumerate(commits)
         ]
 
@@ -197,6 +198,7 @@ def test_generate_interactive(cli_runner, monkeypatch, platform, expected):
         None,
         None,
         dry_run=False,
+        diff=False,
         interactive=expected,
         include_all=False,
         yes=False,
@@ -607,6 +609,19 @@ def test_generate_dry_run(
     )
 
 
+@pytest.mark.usefixtures("_conventional_commits", "config")
+def test_generate_dry_run_diff(
+    cli_runner,
+    changelog,
+):
+    result = cli_runner.invoke(["generate", "--dry-run", "--diff", "--yes"])
+
+    assert result.exit_code == 0
+    assert "--- a/CHANGELOG.md\n+++ b/CHANGELOG.md\n" in result.output
+    assert "\n+## v0.0.1\n" in result.output
+    assert changelog.read_text() == "# Changelog\n"
+
+
 @pytest.mark.usefixtures("_empty_conventional_commits", "config")
 def test_generate_reject_empty(
     cli_runner,
@@ -641,7 +656,7 @@ class TestDelegatesToPerIssuePostProcess:
         monkeypatch,
     ):
         monkeypatch.setattr(typer, "confirm", mock.MagicMock(return_value=True))
-        monkeypatch.setattr(command, "per_issue_post_process", None)
+        monkeypatch.setitem(sys.modules, "changelog_gen.post_processor", None)
 
         result = cli_runner.invoke(["generate"])
 
@@ -656,7 +671,7 @@ class TestDelegatesToPerIssuePostProcess:
     ):
         monkeypatch.setattr(typer, "confirm", mock.MagicMock(return_value=True))
         post_process_mock = mock.MagicMock()
-        monkeypatch.setattr(command, "per_issue_post_process", post_process_mock)
+        monkeypatch.setattr("changelog_gen.post_processor.per_issue_post_process", post_process_mock)
 
         result = cli_runner.invoke(["generate"])
 
@@ -755,7 +770,7 @@ class TestDelegatesToPerIssuePostProcess:
     ):
         monkeypatch.setattr(typer, "confirm", mock.MagicMock(return_value=True))
         post_process_mock = mock.MagicMock()
-        monkeypatch.setattr(command, "per_issue_post_process", post_process_mock)
+        monkeypatch.setattr("changelog_gen.post_processor.per_issue_post_process", post_process_mock)
 
         result = cli_runner.invoke(["generate", "--dry-run"])
 
@@ -835,7 +850,7 @@ class TestDelegatesToPerIssuePostProcess:
     ):
         monkeypatch.setattr(typer, "confirm", mock.MagicMock(return_value=False))
         post_process_mock = mock.MagicMock()
-        monkeypatch.setattr(command, "per_issue_post_process", post_process_mock)
+        monkeypatch.setattr("changelog_gen.post_processor.per_issue_post_process", post_process_mock)
 
         result = cli_runner.invoke(["generate"])
 
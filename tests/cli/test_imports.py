@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative import time budget for the cli, excluding typer itself, in microseconds.
+IMPORT_BUDGET = 150_000
+
+
+def import_times(module):
+    """Cumulative import time per module, as reported by `python -X importtime`."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    # import time: self [us] | cumulative | imported package
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.fixture(scope="module")
+def command_import_times():
+    return [import_times("changelog_gen.cli.command") for _ in range(3)]
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "git",
+        "pygit2",
+        "httpx",
+        "auth_aws4",
+        "jinja2",
+        "sqlite3",
+        "multiprocessing",
+        "changelog_gen.cache",
+    ],
+)
+def test_optional_dependencies_imported_lazily(command_import_times, module):
+    assert module not in command_import_times[0]
+
+
+def test_import_time_budget(command_import_times):
+    elapsed = min(times["changelog_gen.cli.command"] - times["typer"] for times in command_import_times)
+
+    assert elapsed < IMPORT_BUDGET
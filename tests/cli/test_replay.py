@@ -0,0 +1,67 @@
+from unittest import mock
+
+import pytest
+
+
+@pytest.fixture
+def mock_replay(monkeypatch):
+    mock_replay = mock.Mock(return_value=mock.Mock(failed=[]))
+    monkeypatch.setattr("changelog_gen.post_processor.replay_journal", mock_replay)
+    return mock_replay
+
+
+@pytest.fixture
+def journal(cwd):
+    p = cwd / "failed.jsonl"
+    p.write_text("{}\n")
+    return p
+
+
+@pytest.mark.usefixtures("journal")
+def test_replay_requires_post_process(cli_runner, mock_replay):
+    result = cli_runner.invoke(["replay"])
+
+    assert result.exit_code == 1
+    assert result.output == "No post_process configuration found.\n"
+    assert mock_replay.call_count == 0
+
+
+@pytest.mark.usefixtures("journal")
+def test_replay_requires_journal(cli_runner, config_factory, mock_replay):
+    config_factory(post_process={"link_generator": {"source": "issue_ref", "link": "http://localhost/{0}"}})
+
+    result = cli_runner.invoke(["replay"])
+
+    assert result.exit_code == 1
+    assert result.output == "No journal provided, use `--journal` or configure `post_process.journal`.\n"
+    assert mock_replay.call_count == 0
+
+
+def test_replay_no_failures(cli_runner, config_factory, mock_replay):
+    config_factory(post_process={"journal": "failed.jsonl"})
+
+    result = cli_runner.invoke(["replay"])
+
+    assert result.exit_code == 0
+    assert result.output == "No failed requests to replay.\n"
+    assert mock_replay.call_count == 0
+
+
+@pytest.mark.parametrize("args", [[], ["--journal", "failed.jsonl"]])
+def test_replay_configured_journal(cli_runner, config_factory, mock_replay, journal, args):
+    config_factory(post_process={"journal": "failed.jsonl" if not args else "other.jsonl"})
+
+    result = cli_runner.invoke(["replay", "--dry-run", *args])
+
+    assert result.exit_code == 0
+    assert mock_replay.call_args == mock.call(mock.ANY, mock.ANY, journal.relative_to(journal.parent), dry_run=True)
+
+
+@pytest.mark.usefixtures("journal")
+def test_replay_failures_exit_code(cli_runner, config_factory, mock_replay):
+    config_factory(post_process={"journal": "failed.jsonl"})
+    mock_replay.return_value.failed = ["failure"]
+
+    result = cli_runner.invoke(["replay"])
+
+    assert result.exit_code == 1
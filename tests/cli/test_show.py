@@ -0,0 +1,42 @@
+import pytest
+
+
+@pytest.fixture
+def changelog(cwd):
+    p = cwd / "CHANGELOG.md"
+    p.write_text("# Changelog\n\n## v0.0.2 - 2024-03-08\n\n- line2\n\n## v0.0.1\n\n- line1\n")
+    return p
+
+
+@pytest.mark.usefixtures("config")
+def test_show_no_changelog(cli_runner):
+    result = cli_runner.invoke(["show", "0.0.1"])
+
+    assert result.exit_code == 1
+    assert result.output == "No CHANGELOG file detected, run `changelog init`\n"
+
+
+@pytest.mark.usefixtures("config", "changelog")
+@pytest.mark.parametrize("version", ["0.0.1", "v0.0.1"])
+def test_show(cli_runner, version):
+    result = cli_runner.invoke(["show", version])
+
+    assert result.exit_code == 0
+    assert result.output == "## v0.0.1\n\n- line1\n"
+
+
+@pytest.mark.usefixtures("changelog")
+def test_show_version_string(cli_runner, config_factory):
+    config_factory(version_string="{new_version}")
+    result = cli_runner.invoke(["show", "v0.0.2"])
+
+    assert result.exit_code == 0
+    assert result.output == "## v0.0.2 - 2024-03-08\n\n- line2\n"
+
+
+@pytest.mark.usefixtures("config", "changelog")
+def test_show_unknown_release(cli_runner):
+    result = cli_runner.invoke(["show", "0.0.3"])
+
+    assert result.exit_code == 1
+    assert result.output == "Release 0.0.3 not found in CHANGELOG.md.\n"
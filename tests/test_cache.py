@@ -0,0 +1,144 @@
+from collections import defaultdict
+from unittest import mock
+
+import pytest
+
+from changelog_gen.cache import ChangeCache, fingerprint
+from changelog_gen.config import Config
+from changelog_gen.context import Context
+from changelog_gen.extractor import Change, ChangeExtractor, Footer, Link
+from changelog_gen.vcs import Git
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "changelog-gen" / "cache.sqlite"
+
+
+@pytest.fixture
+def change():
+    extractions = defaultdict(list)
+    extractions["issue_ref"].append("1")
+    return Change(
+        "Bug fixes",
+        "Detail about 1",
+        "fix",
+        short_hash="short",
+        commit_hash="hash",
+        scope="config",
+        breaking=True,
+        footers=[Footer("Refs", ": ", "#1")],
+        extractions=extractions,
+        links=[Link("1", "https://github.com/issues/1")],
+    )
+
+
+def test_fingerprint_stable():
+    assert fingerprint({"b": 1, "a": 2}, ["x"]) == fingerprint({"a": 2, "b": 1}, ["x"])
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_round_trip(cache_path, change):
+    cache = ChangeCache(cache_path, "key")
+    cache.put("hash", True, change)  # noqa: FBT003
+    cache.put("hash2", False, None)  # noqa: FBT003
+    cache.flush()
+    cache.close()
+
+    cache = ChangeCache(cache_path, "key")
+
+    assert cache.get("hash") == (True, change)
+    assert cache.get("hash2") == (False, None)
+    assert cache.get("hash3") is None
+
+
+def test_fingerprint_mismatch(cache_path, change):
+    cache = ChangeCache(cache_path, "key")
+    cache.put("hash", True, change)  # noqa: FBT003
+    cache.flush()
+
+    assert ChangeCache(cache_path, "other").get("hash") is None
+
+
+def test_least_recently_used_evicted(cache_path, monkeypatch):
+    now = mock.Mock(side_effect=[1.0, 2.0, 3.0])
+    monkeypatch.setattr("changelog_gen.cache.time.time", now)
+    cache = ChangeCache(cache_path, "key", max_entries=2)
+
+    cache.put("hash1", False, None)  # noqa: FBT003
+    cache.put("hash2", False, None)  # noqa: FBT003
+    cache.flush()
+
+    cache.get("hash1")
+    cache.put("hash3", False, None)  # noqa: FBT003
+    cache.flush()
+
+    cache.put("hash4", False, None)  # noqa: FBT003
+    cache.flush()
+
+    assert cache.get("hash1") is None
+    assert cache.get("hash2") is None
+    assert cache.get("hash3") is not None
+    assert cache.get("hash4") is not None
+
+
+@pytest.fixture
+def conventional_commits(git_repo):
+    f = git_repo.workspace / "hello.txt"
+    for msg in ["fix: Detail about 1\n\nRefs: #1\n", "update readme", "feat: Detail about 2\n"]:
+        f.write_text(msg)
+        git_repo.run("git add hello.txt")
+        git_repo.api.index.commit(msg)
+    return git_repo
+
+
+@pytest.mark.usefixtures("conventional_commits")
+def test_extractor_uses_cache(monkeypatch):
+    cfg = Config(current_version="0.0.0", commit_cache=True)
+    ctx = Context(cfg)
+    git = Git(ctx)
+
+    e = ChangeExtractor(ctx, git, cache=ChangeCache.for_repo(git, cfg))
+    changes = e.extract()
+    stats = dict(e.statistics)
+
+    cache_path = ChangeCache.for_repo(git, cfg).path
+    assert cache_path.exists()
+    assert cache_path.parent.parent.name == ".git"
+
+    e = ChangeExtractor(ctx, git, cache=ChangeCache.for_repo(git, cfg))
+    monkeypatch.setattr(e, "process_log", mock.Mock())
+
+    assert e.extract() == changes
+    assert e.process_log.call_count == 0
+    assert e.statistics == stats == {"commits": 3, "conventional": 2, "nonconventional": 1}
+
+
+@pytest.mark.usefixtures("conventional_commits")
+def test_cache_invalidated_by_config():
+    cfg = Config(current_version="0.0.0", commit_cache=True)
+    ctx = Context(cfg)
+    git = Git(ctx)
+
+    assert ChangeCache.for_repo(git, cfg).fingerprint != ChangeCache.for_repo(git, cfg, include_all=True).fingerprint
+
+    other = Config(current_version="0.0.0", footer_parsers=[r"(Refs)(: )(.*)"])
+    assert ChangeCache.for_repo(git, cfg).fingerprint != ChangeCache.for_repo(git, other).fingerprint
+
+
+@pytest.mark.usefixtures("conventional_commits")
+def test_extractor_uses_cache_in_parallel(monkeypatch):
+    monkeypatch.setattr("changelog_gen.extractor.PARSE_CHUNK_SIZE", 1)
+    cfg = Config(current_version="0.0.0", commit_cache=True, parse_workers=2)
+    ctx = Context(cfg)
+    git = Git(ctx)
+
+    e = ChangeExtractor(ctx, git, cache=ChangeCache.for_repo(git, cfg))
+    changes = e.extract()
+
+    e = ChangeExtractor(ctx, git, cache=ChangeCache.for_repo(git, cfg))
+    monkeypatch.setattr(e, "process_log", mock.Mock())
+
+    assert e.extract() == changes
+    assert e.process_log.call_count == 0
+    assert e.statistics == {"commits": 3, "conventional": 2, "nonconventional": 1}
@@ -0,0 +1,168 @@
+import json
+from unittest import mock
+
+import pytest
+
+from changelog_gen import discovery, errors
+
+
+@pytest.mark.parametrize(
+    ("pattern", "path", "expected"),
+    [
+        ("*.md", "README.md", True),
+        ("*.md", "docs/README.md", False),
+        ("**/*.md", "README.md", True),
+        ("**/*.md", "docs/nested/README.md", True),
+        ("charts/**/Chart.yaml", "charts/Chart.yaml", True),
+        ("charts/**/Chart.yaml", "charts/a/b/Chart.yaml", True),
+        ("charts/**/Chart.yaml", "other/charts/a/Chart.yaml", False),
+        ("charts/*/Chart.yaml", "charts/a/b/Chart.yaml", False),
+        ("charts/**", "charts/a/b/Chart.yaml", True),
+        ("file?.txt", "file1.txt", True),
+        ("file?.txt", "file10.txt", False),
+        ("file[0-2].txt", "file1.txt", True),
+        ("file[!0-2].txt", "file1.txt", False),
+        ("file[!0-2].txt", "file3.txt", True),
+        ("file.txt", "file_txt", False),
+    ],
+)
+def test_match(pattern, path, expected):
+    assert discovery.match(pattern, path) is expected
+
+
+@pytest.mark.parametrize(
+    ("filename", "expected"),
+    [
+        ("README.md", False),
+        ("*.md", True),
+        ("docs/**", True),
+        ("file?.txt", True),
+        ("file[12].txt", True),
+    ],
+)
+def test_is_glob(filename, expected):
+    assert discovery.is_glob(filename) is expected
+
+
+@pytest.fixture
+def git(cwd):
+    git_dir = cwd / ".git"
+    git_dir.mkdir()
+    return mock.Mock(
+        git_dir=git_dir,
+        work_tree=cwd,
+        index_signature=mock.Mock(return_value=(100, 1)),
+        ls_files=mock.Mock(
+            return_value=[
+                "README.md",
+                "charts/a/Chart.yaml",
+                "charts/b/Chart.yaml",
+                "charts/legacy/Chart.yaml",
+                "docs/index.md",
+                "docs/usage.md",
+                "pyproject.toml",
+            ],
+        ),
+    )
+
+
+class TestExpand:
+    def test_explicit_filenames_unchanged(self, cwd, git):
+        entries = [{"filename": "README.md"}, {"filename": "missing.txt", "pattern": "v{version}"}]
+
+        assert discovery.FileDiscovery(git, cwd).expand(entries) == entries
+        assert git.index_signature.call_count == 0
+        assert git.ls_files.call_count == 0
+
+    def test_glob(self, cwd, git):
+        entries = [{"filename": "README.md"}, {"filename": "charts/**/Chart.yaml", "pattern": "version: {version}"}]
+
+        assert discovery.FileDiscovery(git, cwd).expand(entries) == [
+            {"filename": "README.md"},
+            {
+                "filename": "charts/a/Chart.yaml",
+                "expanded_from": "charts/**/Chart.yaml",
+                "pattern": "version: {version}",
+            },
+            {
+                "filename": "charts/b/Chart.yaml",
+                "expanded_from": "charts/**/Chart.yaml",
+                "pattern": "version: {version}",
+            },
+            {
+                "filename": "charts/legacy/Chart.yaml",
+                "expanded_from": "charts/**/Chart.yaml",
+                "pattern": "version: {version}",
+            },
+        ]
+
+    @pytest.mark.parametrize("exclude", ["charts/legacy/**", ["charts/legacy/**"]])
+    def test_glob_exclude(self, cwd, git, exclude):
+        entries = [{"filename": "charts/**/Chart.yaml", "exclude": exclude}]
+
+        assert discovery.FileDiscovery(git, cwd).expand(entries) == [
+            {"filename": "charts/a/Chart.yaml", "expanded_from": "charts/**/Chart.yaml"},
+            {"filename": "charts/b/Chart.yaml", "expanded_from": "charts/**/Chart.yaml"},
+        ]
+
+    def test_directory(self, cwd, git):
+        (cwd / "docs").mkdir()
+
+        assert discovery.FileDiscovery(git, cwd).expand([{"filename": "docs"}]) == [
+            {"filename": "docs/index.md", "expanded_from": "docs"},
+            {"filename": "docs/usage.md", "expanded_from": "docs"},
+        ]
+
+    def test_relative_to_subdirectory(self, cwd, git):
+        subdirectory = cwd / "charts"
+        subdirectory.mkdir()
+
+        assert discovery.FileDiscovery(git, subdirectory).expand([{"filename": "a/*.yaml"}]) == [
+            {"filename": "a/Chart.yaml", "expanded_from": "a/*.yaml"},
+        ]
+
+    def test_no_match_raises(self, cwd, git):
+        with pytest.raises(errors.VersionError, match=r"No files matched '\*\.txt'."):
+            discovery.FileDiscovery(git, cwd).expand([{"filename": "*.txt"}])
+
+    def test_cached_by_index_signature(self, cwd, git):
+        entries = [{"filename": "docs/*.md"}]
+        discovery.FileDiscovery(git, cwd).expand(entries)
+        git.ls_files.return_value = ["docs/index.md"]
+
+        assert discovery.FileDiscovery(git, cwd).expand(entries) == [
+            {"filename": "docs/index.md", "expanded_from": "docs/*.md"},
+            {"filename": "docs/usage.md", "expanded_from": "docs/*.md"},
+        ]
+        assert git.ls_files.call_count == 1
+
+        git.index_signature.return_value = (100, 2)
+
+        assert discovery.FileDiscovery(git, cwd).expand(entries) == [
+            {"filename": "docs/index.md", "expanded_from": "docs/*.md"},
+        ]
+        assert git.ls_files.call_count == 2  # noqa: PLR2004
+
+    def test_cache_invalidated_by_config(self, cwd, git):
+        discovery.FileDiscovery(git, cwd).expand([{"filename": "docs/*.md"}])
+
+        assert discovery.FileDiscovery(git, cwd).expand([{"filename": "docs/index.*"}]) == [
+            {"filename": "docs/index.md", "expanded_from": "docs/index.*"},
+        ]
+        assert git.ls_files.call_count == 2  # noqa: PLR2004
+
+    def test_unmerged_files_listed_once(self, cwd, git):
+        git.ls_files.return_value = ["docs/index.md", "docs/index.md", "docs/index.md"]
+
+        assert discovery.FileDiscovery(git, cwd).expand([{"filename": "docs/*"}]) == [
+            {"filename": "docs/index.md", "expanded_from": "docs/*"},
+        ]
+
+    def test_corrupt_cache_ignored(self, cwd, git):
+        d = discovery.FileDiscovery(git, cwd)
+        d.path.parent.mkdir()
+        d.path.write_text("not json")
+
+        expected = [{"filename": "docs/index.md", "expanded_from": "docs/index.*"}]
+        assert d.expand([{"filename": "docs/index.*"}]) == expected
+        assert json.loads(d.path.read_text())["files"] == expected
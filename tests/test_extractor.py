@@ -1,9 +1,11 @@
 import random
+import time
+from concurrent import futures
 
 import pytest
 
 from changelog_gen import extractor
-from changelog_gen.config import Config, GithubConfig
+from changelog_gen.config import GITHUB_FOOTER_PARSERS, Config, GithubConfig
 from changelog_gen.context import Context
 from changelog_gen.extractor import Change, ChangeExtractor, Footer, Link
 from changelog_gen.vcs import Git
@@ -444,6 +446,148 @@ def test_git_commit_extraction_with_github_optionals(conventional_commits):
     ]
 
 
+def test_process_log_footer_parsers_compiled_once():
+    ctx = Context(
+        Config(
+            current_version="0.0.2",
+            footer_parsers=[r"(Refs)(: )(#?[\w-]+)", r"(Authors)(: )(.*)"],
+            extractors=[{"footer": "Refs", "pattern": r"#(?P<issue_ref>\d+)"}],
+        ),
+    )
+    e = ChangeExtractor(ctx, None)
+
+    assert tuple(p.pattern for p in e.footer_parsers) == (r"(Refs)(: )(#?[\w-]+)", r"(Authors)(: )(.*)")
+    assert e.footer_prefilter is not None
+
+    change = e.process_log(
+        "short",
+        "hash",
+        """fix: Detail about 1
+
+* fix: squashed commit
+* feat: another squashed commit
+
+refs: #1
+Authors: @edgy
+""",
+    )
+
+    assert change.footers == [Footer("refs", ": ", "#1"), Footer("Authors", ": ", "@edgy")]
+    assert change.extractions == {"issue_ref": ["1"]}
+
+
+def test_process_log_footer_parsers_uncombinable():
+    ctx = Context(
+        Config(
+            current_version="0.0.2",
+            footer_parsers=[r"(?P<f>Refs)(: )(#?[\w-]+)", r"(?P<f>Authors)(: )(.*)"],
+        ),
+    )
+    e = ChangeExtractor(ctx, None)
+
+    assert e.footer_prefilter is None
+
+    change = e.process_log(
+        "short",
+        "hash",
+        """fix: Detail about 1
+
+Refs: #1
+Authors: @edgy
+""",
+    )
+
+    assert change.footers == [Footer("Refs", ": ", "#1"), Footer("Authors", ": ", "@edgy")]
+
+
+def test_process_log_github_footers_do_not_mutate_config():
+    cfg = Config(current_version="0.0.2", github=GithubConfig(extract_common_footers=True))
+    footer_parsers = cfg.footer_parsers[::]
+    e = ChangeExtractor(Context(cfg), None)
+
+    for i in range(10):
+        change = e.process_log("short", "hash", f"fix: Detail about {i}\n\ncloses #{i}\n")
+        assert change.footers == [Footer("closes", " ", f"#{i}")]
+
+    assert cfg.footer_parsers == footer_parsers
+    assert len(e.footer_parsers) == len(footer_parsers) + len(GITHUB_FOOTER_PARSERS)
+
+
+def test_process_log_per_commit_cost_constant():
+    cfg = Config(current_version="0.0.2", github=GithubConfig(extract_common_footers=True))
+    e = ChangeExtractor(Context(cfg), None)
+    log = "fix: Detail about 1\n\n" + "* fix: squashed commit\n" * 20 + "closes #1\nRefs: #2\n"
+
+    def per_commit(count):
+        start = time.perf_counter()
+        for _ in range(count):
+            e.process_log("short", "hash", log)
+        return (time.perf_counter() - start) / count
+
+    per_commit(100)  # warm up
+    small, large = per_commit(200), per_commit(2000)
+
+    # Per commit cost previously grew linearly with the number of processed commits.
+    assert large < small * 3
+
+
+@pytest.mark.parametrize("include_all", [True, False])
+def test_process_logs_parallel_matches_serial(monkeypatch, include_all):
+    monkeypatch.setattr(extractor, "PARSE_CHUNK_SIZE", 3)
+    logs = [
+        (f"short{i}", f"hash{i}", f"fix(scope): Detail about {i}\n\nRefs: #{i}\n" if i % 3 else f"update {i}")
+        for i in range(20)
+    ]
+
+    serial = ChangeExtractor(Context(Config(current_version="0.0.2")), None, include_all=include_all)
+    parallel = ChangeExtractor(
+        Context(Config(current_version="0.0.2", parse_workers=2)),
+        None,
+        include_all=include_all,
+    )
+
+    changes = parallel.process_logs(iter(logs))
+
+    assert changes == serial.process_logs(iter(logs))
+    assert [c.short_hash for c in changes] == [f"short{i}" for i in range(20) if include_all or i % 3]
+    assert parallel.statistics == serial.statistics
+
+
+def test_process_logs_parallel_streams_chunks(monkeypatch):
+    monkeypatch.setattr(extractor, "PARSE_CHUNK_SIZE", 3)
+    read, submitted = [], []
+
+    class Executor:
+        def __init__(self, _workers, initializer, initargs):
+            initializer(*initargs)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_args):
+            pass
+
+        def submit(self, fn, logs):
+            future = futures.Future()
+            future.set_result(fn(logs))
+            submitted.append(len(read))
+            return future
+
+    monkeypatch.setattr(futures, "ProcessPoolExecutor", Executor)
+
+    def logs():
+        for i in range(30):
+            read.append(i)
+            yield f"short{i}", f"hash{i}", f"fix: Detail about {i}"
+
+    e = ChangeExtractor(Context(Config(current_version="0.0.2", parse_workers=2)), None)
+    changes = e.process_logs(logs())
+
+    assert [c.short_hash for c in changes] == [f"short{i}" for i in range(30)]
+    # Chunks are submitted as logs are read, rather than once all logs are read.
+    assert submitted == [6, 6, 9, 12, 15, 18, 21, 24, 27, 30]
+
+
 def test_git_commit_extraction_handles_random_tags(conventional_commits, multiversion_repo):
     hashes = conventional_commits
     multiversion_repo.api.create_tag("a-random-tag")
@@ -1,11 +1,15 @@
+import json
+import threading
+import time
 from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import mock
 
 import pytest
 import typer
 from aws4.key_pair import KeyPair
 
-from changelog_gen import post_processor
+from changelog_gen import post_processor, writer
 from changelog_gen.config import PostProcessConfig
 from changelog_gen.extractor import Change
 
@@ -166,6 +170,7 @@ class TestPerIssuePostPrequest:
 
         assert ctx.error.call_args_list == [
             mock.call("Post process request failed."),
+            mock.call("Post process completed with failures, %s succeeded, %s failed.", 1, 1),
         ]
         assert ctx.warning.call_args_list == [
             mock.call("Post processing:"),
@@ -276,3 +281,458 @@ class TestPerIssuePostPrequest:
         )
 
         assert ctx.warning.call_args_list == []
+
+
+def test_render_requests_compiles_body_template_once(monkeypatch):
+    compile_template = mock.Mock(wraps=writer.compile_template)
+    monkeypatch.setattr(post_processor, "compile_template", compile_template)
+    cfg = PostProcessConfig(
+        link_generator={"source": "issue_ref", "link": "https://my-api.github.com/comments/{0}"},
+        body_template='{"issue": {{ source }}, "version": "{{ version }}"}',
+    )
+    changes = [
+        Change("header", "line1", "fix", extractions={"issue_ref": ["1", "2"]}),
+        Change("header", "line2", "fix", extractions={"issue_ref": ["2"]}),
+        Change("header", "line3", "fix"),
+    ]
+
+    requests = post_processor.render_requests(cfg, changes, "3.2.1")
+
+    assert compile_template.call_count == 1
+    assert [(link.link, body) for link, body in requests] == [
+        ("https://my-api.github.com/comments/1", '{"issue": 1, "version": "3.2.1"}'),
+        ("https://my-api.github.com/comments/2", '{"issue": 2, "version": "3.2.1"}'),
+    ]
+
+
+def test_render_requests_deduplicates_by_target():
+    cfg = PostProcessConfig(
+        link_generator={"source": "issue_ref", "link": "https://my-api.github.com/comments/{0}"},
+        body_template='{"body": "{{ change.description }} released in {{ version }}"}',
+    )
+    changes = [
+        Change("header", "line1", "fix", extractions={"issue_ref": ["12"]}),
+        Change("header", "line2", "fix", extractions={"issue_ref": ["3", "12"]}),
+        Change("header", "line1", "fix", extractions={"issue_ref": ["12"]}),
+    ]
+
+    requests = post_processor.render_requests(cfg, changes, "3.2.1")
+
+    assert [(link.link, body) for link, body in requests] == [
+        ("https://my-api.github.com/comments/12", '{"body": "line1 released in 3.2.1"}'),
+        ("https://my-api.github.com/comments/12", '{"body": "line2 released in 3.2.1"}'),
+        ("https://my-api.github.com/comments/3", '{"body": "line2 released in 3.2.1"}'),
+    ]
+    # Links generated once per target
+    assert requests[0][0] is requests[1][0]
+
+
+def test_render_requests_aggregate_body():
+    cfg = PostProcessConfig(
+        link_generator={"source": "issue_ref", "link": "https://my-api.github.com/comments/{0}"},
+        aggregate_body_template=(
+            '{"body": "{{ source }} released in {{ version }}: {{ changes | map(attribute="description") | join(", ") }}"}'
+        ),
+    )
+    changes = [
+        Change("header", "line1", "fix", extractions={"issue_ref": ["12"]}),
+        Change("header", "line2", "fix", extractions={"issue_ref": ["3", "12"]}),
+        Change("header", "line3", "fix", extractions={"issue_ref": ["12"]}),
+        Change("header", "line4", "fix"),
+    ]
+
+    requests = post_processor.render_requests(cfg, changes, "3.2.1")
+
+    assert [(link.link, body) for link, body in requests] == [
+        ("https://my-api.github.com/comments/12", '{"body": "12 released in 3.2.1: line1, line2, line3"}'),
+        ("https://my-api.github.com/comments/3", '{"body": "3 released in 3.2.1: line2"}'),
+    ]
+
+
+def test_post_process_timings_reported(httpx_mock):
+    cfg = PostProcessConfig(
+        link_generator={"source": "issue_ref", "link": "https://my-api.github.com/comments/{0}"},
+    )
+    httpx_mock.add_response(method="POST", url="https://my-api.github.com/comments/1", status_code=HTTPStatus.OK)
+    changes = [Change("header", "line1", "fix", extractions={"issue_ref": ["1"]})]
+    ctx = mock.Mock()
+
+    post_processor.per_issue_post_process(ctx, cfg, changes, "3.2.1")
+
+    assert [c.args[0] for c in ctx.debug.call_args_list] == [
+        "Post process render time %fms",
+        "Post process request time %fms",
+    ]
+
+
+@pytest.fixture
+def stub_server():
+    """Local HTTP server, responds 404 for issues prefixed with `missing`, and sleeps for `slow` issues."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, json.loads(body)))
+            if "slow" in self.path:
+                time.sleep(0.5)
+            status = HTTPStatus.NOT_FOUND if "missing" in self.path else HTTPStatus.OK
+            content = f"{status.phrase} {self.path}".encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *_args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", received
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class TestConcurrentPostProcess:
+    @pytest.mark.parametrize("concurrency", [0, 1, 4])
+    def test_summary(self, stub_server, concurrency):
+        url, received = stub_server
+        cfg = PostProcessConfig(
+            link_generator={"source": "issue_ref", "link": url + "/issue/{0}"},
+            body_template='{"issue": "{{ source }}", "version": "{{ version }}"}',
+            concurrency=concurrency,
+        )
+        changes = [
+            Change("header", f"line{i}", "fix", extractions={"issue_ref": [str(i) if i % 3 else f"missing{i}"]})
+            for i in range(1, 10)
+        ]
+        ctx = mock.Mock()
+
+        summary = post_processor.per_issue_post_process(ctx, cfg, changes, "1.0.0")
+
+        assert sorted(path for path, _ in received) == sorted(
+            f"/issue/{c.extractions['issue_ref'][0]}" for c in changes
+        )
+        assert [r.link.text for r in summary.succeeded] == ["1", "2", "4", "5", "7", "8"]
+        assert [(r.link.text, r.status_code, r.error) for r in summary.failed] == [
+            (f"missing{i}", HTTPStatus.NOT_FOUND, f"Not Found /issue/missing{i}") for i in (3, 6, 9)
+        ]
+        # Reported in request order, regardless of completion order
+        assert [c.args[2] for c in ctx.info.call_args_list if c.args[0].startswith("Request")] == [
+            f"{url}/issue/{c.extractions['issue_ref'][0]}" for c in changes
+        ]
+        assert ctx.error.call_args_list[-1] == mock.call(
+            "Post process completed with failures, %s succeeded, %s failed.",
+            6,
+            3,
+        )
+
+    def test_requests_run_concurrently(self, stub_server):
+        url, received = stub_server
+        cfg = PostProcessConfig(
+            link_generator={"source": "issue_ref", "link": url + "/issue/{0}"},
+            body_template="{}",
+            concurrency=4,
+        )
+        changes = [Change("header", "line", "fix", extractions={"issue_ref": [f"slow{i}" for i in range(4)]})]
+
+        start = time.perf_counter()
+        summary = post_processor.per_issue_post_process(mock.Mock(), cfg, changes, "1.0.0")
+
+        assert time.perf_counter() - start < 1.5  # noqa: PLR2004
+        assert len(summary.succeeded) == 4  # noqa: PLR2004
+        assert len(received) == 4  # noqa: PLR2004
+
+    def test_timeout_reported_as_failure(self, stub_server):
+        url, _received = stub_server
+        cfg = PostProcessConfig(
+            link_generator={"source": "issue_ref", "link": url + "/issue/{0}"},
+            body_template="{}",
+            timeout=0.1,
+        )
+        changes = [Change("header", "line", "fix", extractions={"issue_ref": ["slow"]})]
+        ctx = mock.Mock()
+
+        summary = post_processor.per_issue_post_process(ctx, cfg, changes, "1.0.0")
+
+        assert summary.succeeded == []
+        assert summary.failed[0].status_code is None
+        assert summary.failed[0].error.startswith("ReadTimeout")
+
+    def test_http2_requires_h2(self, monkeypatch):
+        monkeypatch.setattr(post_processor.httpx, "Client", mock.Mock(side_effect=ImportError("h2")))
+        cfg = PostProcessConfig(http2=True)
+        ctx = mock.Mock()
+
+        with pytest.raises(typer.Exit):
+            post_processor.make_client(ctx, cfg)
+
+        assert ctx.error.call_args == mock.call("h2 required to use http2, install with `pip install httpx[http2]`.")
+
+
+class TestRetries:
+    @pytest.fixture(autouse=True)
+    def sleep(self, monkeypatch):
+        sleep = mock.Mock()
+        monkeypatch.setattr(post_processor.time, "sleep", sleep)
+        return sleep
+
+    @pytest.fixture
+    def cfg(self):
+        return PostProcessConfig(
+            link_generator={"source": "issue_ref", "link": "https://my-api.github.com/comments/{0}"},
+            max_attempts=3,
+        )
+
+    def test_retries_transient_errors(self, httpx_mock, cfg, sleep, monkeypatch):
+        monkeypatch.setattr(post_processor.random, "uniform", lambda _a, b: b)
+        cfg.verb = "PUT"
+        url = "https://my-api.github.com/comments/1"
+        httpx_mock.add_response(method="PUT", url=url, status_code=HTTPStatus.SERVICE_UNAVAILABLE)
+        httpx_mock.add_exception(httpx.ConnectError("refused"), method="PUT", url=url)
+        httpx_mock.add_response(method="PUT", url=url, status_code=HTTPStatus.OK)
+        client = httpx.Client()
+
+        result = post_processor.send_request(client, cfg, post_processor.Link("1", url), "{}")
+
+        assert result.ok
+        assert result.attempts == 3  # noqa: PLR2004
+        assert sleep.call_args_list == [mock.call(0.5), mock.call(1.0)]
+
+    def test_respects_retry_after(self, httpx_mock, cfg, sleep):
+        url = "https://my-api.github.com/comments/1"
+        httpx_mock.add_response(
+            method="POST",
+            url=url,
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            headers={"Retry-After": "7"},
+        )
+        httpx_mock.add_response(method="POST", url=url, status_code=HTTPStatus.OK)
+
+        result = post_processor.send_request(httpx.Client(), cfg, post_processor.Link("1", url), "{}")
+
+        assert result.ok
+        assert sleep.call_args_list == [mock.call(7.0)]
+
+    def test_retry_after_over_backoff_max_not_retried(self, httpx_mock, cfg, sleep):
+        url = "https://my-api.github.com/comments/1"
+        httpx_mock.add_response(
+            method="POST",
+            url=url,
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            headers={"Retry-After": "86400"},
+            content=b"slow down",
+        )
+
+        result = post_processor.send_request(httpx.Client(), cfg, post_processor.Link("1", url), "{}")
+
+        assert not result.ok
+        assert result.attempts == 1
+        assert result.error == "slow down"
+        assert sleep.call_count == 0
+
+    def test_read_timeout_not_retried_for_post(self, httpx_mock, cfg, sleep):
+        url = "https://my-api.github.com/comments/1"
+        httpx_mock.add_exception(httpx.ReadTimeout("timed out"), method="POST", url=url)
+
+        result = post_processor.send_request(httpx.Client(), cfg, post_processor.Link("1", url), "{}")
+
+        assert not result.ok
+        assert result.attempts == 1
+        assert result.error == "ReadTimeout: timed out"
+        assert sleep.call_count == 0
+
+    @pytest.mark.parametrize("error", [httpx.ConnectError("refused"), httpx.ConnectTimeout("timed out")])
+    def test_connect_errors_retried_for_post(self, httpx_mock, cfg, sleep, error):
+        url = "https://my-api.github.com/comments/1"
+        httpx_mock.add_exception(error, method="POST", url=url)
+        httpx_mock.add_response(method="POST", url=url, status_code=HTTPStatus.OK)
+
+        result = post_processor.send_request(httpx.Client(), cfg, post_processor.Link("1", url), "{}")
+
+        assert result.ok
+        assert result.attempts == 2  # noqa: PLR2004
+        assert sleep.call_count == 1
+
+    @pytest.mark.parametrize(
+        "status_code",
+        [
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+            HTTPStatus.BAD_GATEWAY,
+            HTTPStatus.SERVICE_UNAVAILABLE,
+            HTTPStatus.GATEWAY_TIMEOUT,
+        ],
+    )
+    def test_server_errors_not_retried_for_post(self, httpx_mock, cfg, sleep, status_code):
+        url = "https://my-api.github.com/comments/1"
+        httpx_mock.add_response(method="POST", url=url, status_code=status_code, content=b"oops")
+
+        result = post_processor.send_request(httpx.Client(), cfg, post_processor.Link("1", url), "{}")
+
+        assert not result.ok
+        assert result.attempts == 1
+        assert len(httpx_mock.get_requests()) == 1
+        assert sleep.call_count == 0
+
+    def test_service_unavailable_with_retry_after_retried_for_post(self, httpx_mock, cfg, sleep):
+        url = "https://my-api.github.com/comments/1"
+        httpx_mock.add_response(
+            method="POST",
+            url=url,
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "2"},
+        )
+        httpx_mock.add_response(method="POST", url=url, status_code=HTTPStatus.OK)
+
+        result = post_processor.send_request(httpx.Client(), cfg, post_processor.Link("1", url), "{}")
+
+        assert result.ok
+        assert result.attempts == 2  # noqa: PLR2004
+        assert sleep.call_args_list == [mock.call(2.0)]
+
+    def test_read_timeout_retried_for_idempotent_verbs(self, httpx_mock, cfg, sleep):
+        cfg.verb = "PUT"
+        url = "https://my-api.github.com/comments/1"
+        httpx_mock.add_exception(httpx.ReadTimeout("timed out"), method="PUT", url=url)
+        httpx_mock.add_response(method="PUT", url=url, status_code=HTTPStatus.OK)
+
+        result = post_processor.send_request(httpx.Client(), cfg, post_processor.Link("1", url), "{}")
+
+        assert result.ok
+        assert result.attempts == 2  # noqa: PLR2004
+        assert sleep.call_count == 1
+
+    def test_gives_up_after_max_attempts(self, httpx_mock, cfg, sleep):
+        cfg.verb = "PUT"
+        url = "https://my-api.github.com/comments/1"
+        for _ in range(3):
+            httpx_mock.add_response(method="PUT", url=url, status_code=HTTPStatus.BAD_GATEWAY, content=b"down")
+
+        result = post_processor.send_request(httpx.Client(), cfg, post_processor.Link("1", url), "{}")
+
+        assert not result.ok
+        assert result.attempts == 3  # noqa: PLR2004
+        assert result.error == "down"
+        assert sleep.call_count == 2  # noqa: PLR2004
+
+    def test_client_errors_not_retried(self, httpx_mock, cfg, sleep):
+        url = "https://my-api.github.com/comments/1"
+        httpx_mock.add_response(method="POST", url=url, status_code=HTTPStatus.NOT_FOUND)
+
+        result = post_processor.send_request(httpx.Client(), cfg, post_processor.Link("1", url), "{}")
+
+        assert result.status_code == HTTPStatus.NOT_FOUND
+        assert result.attempts == 1
+        assert sleep.call_count == 0
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, None),
+        ("10", 10.0),
+        ("-1", 0.0),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+        ("Wed, 21 Oct 2015 07:28:00 -0000", 0.0),
+        ("soon", None),
+    ],
+)
+def test_retry_after(value, expected):
+    headers = {"Retry-After": value} if value is not None else {}
+
+    assert post_processor.retry_after(httpx.Response(HTTPStatus.TOO_MANY_REQUESTS, headers=headers)) == expected
+
+
+def test_rate_limiter(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(post_processor.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(post_processor.time, "sleep", lambda s: now.__setitem__(0, now[0] + s))
+    limiter = post_processor.RateLimiter(2)
+
+    for _ in range(6):
+        limiter.acquire()
+
+    # Initial burst of 2, then 2 per second.
+    assert now[0] == pytest.approx(2.0)
+
+
+class TestJournal:
+    def test_failures_recorded(self, httpx_mock, tmp_path):
+        journal = tmp_path / "journal.jsonl"
+        cfg = PostProcessConfig(
+            link_generator={"source": "issue_ref", "link": "https://my-api.github.com/comments/{0}"},
+            journal=str(journal),
+        )
+        httpx_mock.add_response(method="POST", url="https://my-api.github.com/comments/1")
+        httpx_mock.add_response(
+            method="POST",
+            url="https://my-api.github.com/comments/2",
+            status_code=500,
+            content=b"oops",
+        )
+        changes = [Change("header", "line1", "fix", extractions={"issue_ref": ["1", "2"]})]
+
+        post_processor.per_issue_post_process(mock.Mock(), cfg, changes, "1.0.0")
+
+        assert [json.loads(line) for line in journal.read_text().splitlines()] == [
+            {
+                "text": "2",
+                "link": "https://my-api.github.com/comments/2",
+                "body": '{"body": "Released on 1.0.0"}',
+                "error": "oops",
+            },
+        ]
+
+    def test_replay(self, httpx_mock, tmp_path):
+        journal = tmp_path / "journal.jsonl"
+        post_processor.write_journal(
+            journal,
+            [
+                post_processor.PostProcessResult(post_processor.Link("1", "https://my-api.github.com/comments/1"), "a"),
+                post_processor.PostProcessResult(post_processor.Link("2", "https://my-api.github.com/comments/2"), "b"),
+            ],
+        )
+        httpx_mock.add_response(method="POST", url="https://my-api.github.com/comments/1", match_content=b"a")
+        httpx_mock.add_response(method="POST", url="https://my-api.github.com/comments/2", status_code=500)
+
+        summary = post_processor.replay_journal(mock.Mock(), PostProcessConfig(), journal)
+
+        assert len(summary.succeeded) == 1
+        assert post_processor.read_journal(journal) == [
+            (post_processor.Link("2", "https://my-api.github.com/comments/2"), "b"),
+        ]
+
+    def test_replay_all_delivered(self, httpx_mock, tmp_path):
+        journal = tmp_path / "journal.jsonl"
+        post_processor.write_journal(
+            journal,
+            [post_processor.PostProcessResult(post_processor.Link("1", "https://my-api.github.com/comments/1"), "a")],
+        )
+        httpx_mock.add_response(method="POST", url="https://my-api.github.com/comments/1")
+
+        post_processor.replay_journal(mock.Mock(), PostProcessConfig(), journal)
+
+        assert not journal.exists()
+
+    def test_replay_dry_run(self, tmp_path):
+        journal = tmp_path / "journal.jsonl"
+        post_processor.write_journal(
+            journal,
+            [post_processor.PostProcessResult(post_processor.Link("1", "https://my-api.github.com/comments/1"), "a")],
+        )
+        ctx = mock.Mock()
+
+        post_processor.replay_journal(ctx, PostProcessConfig(), journal, dry_run=True)
+
+        assert journal.exists()
+        assert ctx.warning.call_args_list[-1] == mock.call(
+            "Would request: %s %s %s",
+            "POST",
+            "https://my-api.github.com/comments/1",
+            "a",
+        )
@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from changelog_gen import util
+
+
+def double(value):
+    return value * 2
+
+
+def quadruple(value):
+    return double(double(value))
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    profiler = util.Profiler()
+    monkeypatch.setattr(util, "_profiler", profiler)
+    # Functions are only wrapped if profiling is enabled when decorated.
+    monkeypatch.setattr(sys.modules[__name__], "double", util.timer(double))
+    monkeypatch.setattr(sys.modules[__name__], "quadruple", util.timer(quadruple))
+    return profiler
+
+
+def test_timer_disabled_returns_function():
+    assert util.timer(double) is double
+
+
+def test_timer_preserves_metadata(profiler):  # noqa: ARG001
+    assert quadruple.__name__ == "quadruple"
+    assert quadruple.__wrapped__ is not None
+
+
+def test_timer_records_nested_spans(profiler):
+    assert quadruple(1) == 4  # noqa: PLR2004
+
+    outer, *inner = sorted(profiler.spans, key=lambda s: s.duration, reverse=True)
+    assert outer.name == "tests.test_util.quadruple"
+    assert [span.name for span in inner] == ["tests.test_util.double"] * 2
+    for span in inner:
+        assert outer.start <= span.start
+        assert span.start + span.duration <= outer.start + outer.duration
+
+
+def test_timer_records_failures(profiler):
+    @util.timer
+    def fail():
+        raise ValueError
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        fail()
+
+    assert len(profiler.spans) == 1
+
+
+def legacy_timer(func):
+    """Previous timer implementation, timing and logging every call."""
+    logger = logging.getLogger(__name__)
+
+    def wrapper(*arg, **kw):
+        t1 = time.time_ns()
+        try:
+            res = func(*arg, **kw)
+        finally:
+            t2 = time.time_ns()
+            logger.debug("%s %fms", func.__name__, (t2 - t1) / 1000000)
+        return res
+
+    return wrapper
+
+
+def test_span_disabled_calls_function():
+    assert util.span("name", double, 2) == 4  # noqa: PLR2004
+
+
+def test_span_records_name(profiler):
+    assert util.span("upper[a]", str.upper, "a") == "A"
+    util.span("upper[b]", str.upper, "b")
+
+    assert [span.name for span in profiler.spans] == ["upper[a]", "upper[b]"]
+
+
+def test_timer_overhead_benchmark():
+    def noop():
+        pass
+
+    def per_call(func, count=50_000):
+        start = time.perf_counter_ns()
+        for _ in range(count):
+            func()
+        return (time.perf_counter_ns() - start) / count
+
+    baseline = min(per_call(noop) for _ in range(3))
+    legacy = min(per_call(legacy_timer(noop)) for _ in range(3)) - baseline
+    current = min(per_call(util.timer(noop)) for _ in range(3)) - baseline
+
+    sys.stderr.write(f"timer overhead per call: legacy {legacy:.0f}ns, current {current:.0f}ns\n")
+    assert current < legacy / 2
+
+
+def test_stats():
+    profiler = util.Profiler()
+    profiler.spans = [util.Span("a", 0, d, 1) for d in range(1, 21)] + [util.Span("b", 0, 1000, 1)]
+
+    assert profiler.stats() == [
+        {"name": "b", "calls": 1, "total": 1000, "mean": 1000, "p95": 1000},
+        {"name": "a", "calls": 20, "total": 210, "mean": 10.5, "p95": 19},
+    ]
+
+
+def test_table():
+    profiler = util.Profiler()
+    profiler.spans = [util.Span("func", 0, 2_000_000, 1), util.Span("func", 0, 4_000_000, 1)]
+
+    assert profiler.table() == (
+        "function   calls      total       mean        p95\nfunc           2      6.000      3.000      4.000"
+    )
+
+
+def test_trace():
+    profiler = util.Profiler()
+    profiler.spans = [util.Span("func", 1_000, 2_000, 1)]
+
+    event = profiler.trace()["traceEvents"][0]
+
+    assert event["name"] == "func"
+    assert event["ph"] == "X"
+    assert (event["ts"], event["dur"]) == (1, 2)
+
+
+def test_report_trace(tmp_path):
+    profiler = util.Profiler()
+    profiler.spans = [util.Span("func", 1_000, 2_000, 1)]
+    target = tmp_path / "trace.json"
+
+    profiler.report(str(target))
+
+    assert json.loads(target.read_text()) == profiler.trace()
+
+
+def test_report_table(capsys):
+    profiler = util.Profiler()
+    profiler.spans = [util.Span("func", 1_000, 2_000, 1)]
+
+    profiler.report("table")
+
+    assert capsys.readouterr().err == profiler.table() + "\n"
+
+
+def test_profile_env(tmp_path):
+    target = tmp_path / "trace.json"
+    subprocess.run(  # noqa: S603
+        [sys.executable, "-c", "from changelog_gen import config; config._process_overrides({})"],
+        env={**os.environ, "CHANGELOG_GEN_PROFILE": str(target)},
+        check=True,
+    )
+
+    events = json.loads(target.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == ["changelog_gen.config._process_overrides"]
+
+
+def test_profile_env_not_reported_by_workers():
+    script = """
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from changelog_gen import util
+
+with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+    assert list(pool.map(util.span, ["worker"] * 2, [abs] * 2, [-1] * 2)) == [1, 1]
+util.span("main", abs, -1)
+"""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", script],
+        env={**os.environ, "CHANGELOG_GEN_PROFILE": "table"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    lines = result.stderr.splitlines()
+    assert [line.split()[0] for line in lines] == ["function", "main"]
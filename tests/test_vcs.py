@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from unittest import mock
 
 import git
@@ -9,8 +11,20 @@ from changelog_gen.context import Context
 from changelog_gen.vcs import Git
 
 
+@pytest.fixture(params=["git", "pygit2"])
+def backend(request):
+    if request.param == "pygit2":
+        pytest.importorskip("pygit2")
+    return request.param
+
+
+@pytest.fixture
+def context(backend):
+    return Context(Config(current_version="0.0.0", vcs_backend=backend))
+
+
 @pytest.fixture
-def context():
+def git_context():
     return Context(Config(current_version="0.0.0"))
 
 
@@ -56,135 +70,282 @@ def multiversion_v_repo(git_repo):
 
 def test_init_no_repo(context):
     with pytest.raises(errors.VcsError, match="No git repository found"):
-        Git(context)
+        vcs.new_vcs(context)
+
+
+def test_init_subdirectory(context, git_repo, monkeypatch):
+    subdirectory = git_repo.workspace / "sub"
+    subdirectory.mkdir()
+    monkeypatch.chdir(subdirectory)
+
+    with pytest.raises(errors.VcsError, match="No git repository found"):
+        vcs.new_vcs(context)
+
+
+def test_new_vcs(context, backend, git_repo):  # noqa: ARG001
+    assert vcs.new_vcs(context).name == backend
+
+
+def test_new_vcs_unsupported_backend():
+    context = Context(Config(current_version="0.0.0", vcs_backend="hg"))
+
+    with pytest.raises(errors.VcsError, match='VCS backend "hg" not supported.'):
+        vcs.new_vcs(context)
+
 
+def test_new_vcs_pygit2_not_installed(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pygit2", None)
+    monkeypatch.delitem(sys.modules, "changelog_gen.vcs_pygit2", raising=False)
+    context = Context(Config(current_version="0.0.0", vcs_backend="pygit2"))
 
-def test_get_current_info_branch(multiversion_repo, monkeypatch, context):
-    monkeypatch.setattr(vcs.git.Repo, "iter_commits", mock.Mock(return_value=[]))
+    with pytest.raises(errors.VcsError, match="pygit2 required for pygit2 vcs backend"):
+        vcs.new_vcs(context)
+
+
+@pytest.fixture
+def remote_repo(multiversion_repo, tmp_path):
+    remote = tmp_path / "remote.git"
+    multiversion_repo.run(f"git init --bare {remote}")
+    multiversion_repo.run(f"git remote add origin {remote}")
+    multiversion_repo.run("git push -u origin main")
+    return multiversion_repo
+
+
+def commit(repo, content):
+    f = repo.workspace / "hello.txt"
+    f.write_text(content)
+    repo.run("git add hello.txt")
+    repo.api.index.commit(content)
+
+
+def test_get_current_info_branch(multiversion_repo, context):
     path = multiversion_repo.workspace
     f = path / "hello.txt"
 
     f.write_text("hello world! v3")
 
-    info = Git(context).get_current_info()
+    info = vcs.new_vcs(context).get_current_info()
 
     assert info["branch"] == "main"
 
 
-@pytest.mark.usefixtures("multiversion_repo")
-def test_get_current_info_clean(monkeypatch, context):
-    monkeypatch.setattr(vcs.git.Repo, "iter_commits", mock.Mock(return_value=[]))
-    info = Git(context).get_current_info()
+@pytest.mark.usefixtures("remote_repo")
+def test_get_current_info_clean(context):
+    info = vcs.new_vcs(context).get_current_info()
 
-    assert info["dirty"] is False
+    assert info == {
+        "missing_local": False,
+        "missing_remote": False,
+        "dirty": False,
+        "branch": "main",
+    }
 
 
-def test_get_current_info_dirty(multiversion_repo, monkeypatch, context):
-    monkeypatch.setattr(vcs.git.Repo, "iter_commits", mock.Mock(return_value=[]))
+def test_get_current_info_dirty(multiversion_repo, context):
     path = multiversion_repo.workspace
     f = path / "hello.txt"
 
     f.write_text("hello world! v3")
 
-    info = Git(context).get_current_info()
+    info = vcs.new_vcs(context).get_current_info()
+
+    assert info["dirty"] is True
+
+
+def test_get_current_info_untracked_not_dirty(remote_repo, context):
+    (remote_repo.workspace / "untracked.txt").write_text("untracked")
+
+    info = vcs.new_vcs(context).get_current_info()
+
+    assert info["dirty"] is False
+
+
+def test_get_current_info_staged_dirty(remote_repo, context):
+    (remote_repo.workspace / "new.txt").write_text("new")
+    remote_repo.run("git add new.txt")
+
+    info = vcs.new_vcs(context).get_current_info()
 
     assert info["dirty"] is True
 
 
 @pytest.mark.usefixtures("multiversion_repo")
-def test_get_current_info_error_remote_branch(monkeypatch, context):
+def test_get_current_info_status_error(monkeypatch, git_context):
     monkeypatch.setattr(
-        vcs.git.Repo,
-        "iter_commits",
-        mock.Mock(side_effect=vcs.git.GitCommandError("git iter_commits")),
+        vcs.git.cmd.Git,
+        "status",
+        mock.Mock(side_effect=vcs.git.GitCommandError("git status")),
+        raising=False,
     )
 
-    with pytest.raises(errors.VcsError, match="Unable to determine missing commit status"):
-        Git(context).get_current_info()
+    with pytest.raises(errors.VcsError, match="Unable to determine repository status"):
+        Git(git_context).get_current_info()
 
 
 @pytest.mark.usefixtures("multiversion_repo")
-def test_get_current_info_error_local_branch(monkeypatch, context):
+def test_get_current_info_error_remote_branch(monkeypatch, git_context):
     monkeypatch.setattr(
-        vcs.git.Repo,
-        "iter_commits",
-        mock.Mock(side_effect=[[], vcs.git.GitCommandError("git iter_commits")]),
+        vcs.git.cmd.Git,
+        "rev_list",
+        mock.Mock(side_effect=vcs.git.GitCommandError("git rev-list")),
+        raising=False,
     )
 
     with pytest.raises(errors.VcsError, match="Unable to determine missing commit status"):
-        Git(context).get_current_info()
+        Git(git_context).get_current_info()
 
 
 @pytest.mark.usefixtures("multiversion_repo")
-def test_get_current_info_no_local_branch(monkeypatch, context):
-    monkeypatch.setattr(
-        vcs.git.Repo,
-        "iter_commits",
-        mock.Mock(side_effect=[vcs.git.GitCommandError("cmd", "bad revision 'HEAD..origin/main'"), []]),
-    )
+def test_get_current_info_no_remote_branch(context):
+    info = vcs.new_vcs(context).get_current_info()
 
-    info = Git(context).get_current_info()
     assert info["missing_local"] is False
+    assert info["missing_remote"] is True
 
 
-@pytest.mark.usefixtures("multiversion_repo")
-def test_get_current_info_no_remote_branch(monkeypatch, context):
-    monkeypatch.setattr(
-        vcs.git.Repo,
-        "iter_commits",
-        mock.Mock(side_effect=[[], vcs.git.GitCommandError("cmd", "bad revision 'origin/main..HEAD'")]),
+def test_get_current_info_missing_local(remote_repo, tmp_path, context):
+    clone = tmp_path / "clone"
+    remote_repo.run(f"git clone -b main {tmp_path / 'remote.git'} {clone}")
+    remote_repo.run(
+        f"git -C {clone} -c user.name=a -c user.email=b commit --allow-empty -m remote && git -C {clone} push",
     )
+    remote_repo.run("git fetch")
 
-    info = Git(context).get_current_info()
-    assert info["missing_remote"] is True
+    info = vcs.new_vcs(context).get_current_info()
 
+    assert info["missing_local"] is True
+    assert info["missing_remote"] is False
 
-@pytest.mark.usefixtures("multiversion_repo")
-def test_get_current_info_missing_local(monkeypatch, context):
-    monkeypatch.setattr(vcs.git.Repo, "iter_commits", mock.Mock(side_effect=[["commit"], []]))
 
-    info = Git(context).get_current_info()
+def test_get_current_info_missing_remote(remote_repo, context):
+    commit(remote_repo, "hello world! v3")
 
-    assert info["missing_local"] is True
+    info = vcs.new_vcs(context).get_current_info()
+
+    assert info["missing_local"] is False
+    assert info["missing_remote"] is True
 
 
-@pytest.mark.usefixtures("multiversion_repo")
-def test_get_current_info_missing_remote(monkeypatch, context):
-    monkeypatch.setattr(vcs.git.Repo, "iter_commits", mock.Mock(side_effect=[[], ["commit"]]))
+def test_get_current_info_untracked_remote_branch(remote_repo, context):
+    # origin/main exists, but is not configured as the upstream
+    remote_repo.run("git branch --unset-upstream")
+    commit(remote_repo, "hello world! v3")
 
-    info = Git(context).get_current_info()
+    info = vcs.new_vcs(context).get_current_info()
 
+    assert info["missing_local"] is False
     assert info["missing_remote"] is True
 
 
 @pytest.mark.usefixtures("multiversion_repo")
 def test_get_find_tag(context):
-    tag = Git(context).find_tag("0.0.2")
+    tag = vcs.new_vcs(context).find_tag("0.0.2")
 
     assert tag == "0.0.2"
 
 
 @pytest.mark.usefixtures("multiversion_repo")
 def test_get_find_tag_no_tag(context):
-    tag = Git(context).find_tag("0.0.3")
+    tag = vcs.new_vcs(context).find_tag("0.0.3")
 
     assert tag is None
 
 
 @pytest.mark.usefixtures("multiversion_v_repo")
 def test_get_find_tag_vtag(context):
-    tag = Git(context).find_tag("0.0.2")
+    tag = vcs.new_vcs(context).find_tag("0.0.2")
 
     assert tag == "v0.0.2"
 
 
+@pytest.mark.parametrize("tag", ["foo-v0.0.3", "v10.0.3", "10.0.3", "0.0.3-rc1"])
+def test_get_find_tag_exact_match(multiversion_repo, context, tag):
+    multiversion_repo.api.create_tag(tag)
+
+    assert vcs.new_vcs(context).find_tag("0.0.3") is None
+
+
+def test_get_find_tag_version_string(multiversion_repo, backend):
+    multiversion_repo.api.create_tag("release-0.0.2")
+    context = Context(Config(current_version="0.0.0", version_string="release-{new_version}", vcs_backend=backend))
+
+    tag = vcs.new_vcs(context).find_tag("0.0.2")
+
+    assert tag == "release-0.0.2"
+
+
+@pytest.mark.usefixtures("multiversion_repo")
+def test_get_find_tag_version_string_fallback(backend):
+    context = Context(Config(current_version="0.0.0", version_string="release-{new_version}", vcs_backend=backend))
+
+    tag = vcs.new_vcs(context).find_tag("0.0.2")
+
+    assert tag == "0.0.2"
+
+
+def test_find_tag_reads_new_tags(multiversion_repo, context):
+    g = vcs.new_vcs(context)
+    assert g.find_tag("0.0.3") is None
+
+    multiversion_repo.api.create_tag("0.0.3")
+    multiversion_repo.api.create_tag("release/0.0.3")
+    multiversion_repo.run("git pack-refs --all")
+    multiversion_repo.api.create_tag("release/0.0.4")
+
+    assert g.find_tag("0.0.3") == "0.0.3"
+    assert g.existing_tags(["release/0.0.3", "release/0.0.4", "release"]) == {"release/0.0.3", "release/0.0.4"}
+
+
+@pytest.mark.usefixtures("multiversion_repo")
+def test_find_tag_looks_up_candidates_only(monkeypatch, git_context):
+    g = Git(git_context)
+    monkeypatch.setattr(g, "tags", mock.Mock(side_effect=AssertionError))
+
+    assert g.find_tag("0.0.2") == "0.0.2"
+
+
+def test_work_tree(multiversion_repo, context):
+    assert vcs.new_vcs(context).work_tree.resolve() == multiversion_repo.workspace.resolve()
+
+
+def test_ls_files(multiversion_repo, context):
+    path = multiversion_repo.workspace
+    (path / "docs").mkdir()
+    (path / "docs" / "index.md").write_text("docs")
+    (path / "untracked.txt").write_text("untracked")
+    multiversion_repo.run("git add docs/index.md")
+
+    assert sorted(vcs.new_vcs(context).ls_files()) == ["docs/index.md", "hello.txt"]
+
+
+def test_index_signature_changes_with_index(multiversion_repo, context):
+    path = multiversion_repo.workspace
+    git = vcs.new_vcs(context)
+    objects = multiversion_repo.run("git count-objects -v", capture=True)
+    signature = git.index_signature()
+
+    assert git.index_signature() == signature
+    assert multiversion_repo.run("git count-objects -v", capture=True) == objects
+
+    (path / "new.txt").write_text("new")
+    assert git.index_signature() == signature
+
+    multiversion_repo.run("git add new.txt")
+    assert git.index_signature() != signature
+
+
+@pytest.mark.usefixtures("git_repo")
+def test_index_signature_empty_repo(context):
+    assert vcs.new_vcs(context).index_signature() is None
+
+
 def test_add_paths_stages_changes_for_commit(multiversion_repo, context):
     path = multiversion_repo.workspace
     f = path / "hello.txt"
     f.write_text("hello world! v3")
     assert "Changes not staged for commit" in multiversion_repo.run("git status", capture=True)
 
-    Git(context).add_paths(["hello.txt"])
+    vcs.new_vcs(context).add_paths(["hello.txt"])
 
     assert "Changes not staged for commit" not in multiversion_repo.run("git status", capture=True)
 
@@ -194,7 +355,7 @@ def test_add_paths_dry_run(multiversion_repo, context):
     f = path / "hello.txt"
     f.write_text("hello world! v3")
 
-    Git(context, dry_run=True).add_paths(["hello.txt"])
+    vcs.new_vcs(context, dry_run=True).add_paths(["hello.txt"])
 
     assert "Changes not staged for commit" in multiversion_repo.run("git status", capture=True)
 
@@ -205,7 +366,7 @@ def test_commit_adds_message_with_version_string(multiversion_repo, context):
     f.write_text("hello world! v3")
     multiversion_repo.run("git add hello.txt")
 
-    Git(context).commit("current_version", "new_version", "version_tag")
+    vcs.new_vcs(context).commit("current_version", "new_version", "version_tag")
 
     assert (
         multiversion_repo.api.head.commit.message
@@ -218,7 +379,7 @@ def test_commit_with_paths(multiversion_repo, context):
     f = path / "hello.txt"
     f.write_text("hello world! v3")
 
-    Git(context).commit("current_version", "new_version", "version_tag", ["hello.txt"])
+    vcs.new_vcs(context).commit("current_version", "new_version", "version_tag", ["hello.txt"])
 
     assert (
         multiversion_repo.api.head.commit.message
@@ -231,18 +392,18 @@ def test_commit_dry_run(multiversion_repo, context):
     f = path / "hello.txt"
     f.write_text("hello world! v3")
 
-    Git(context, dry_run=True).commit("current_version", "new_version", "version_tag", ["hello.txt"])
+    vcs.new_vcs(context, dry_run=True).commit("current_version", "new_version", "version_tag", ["hello.txt"])
 
     assert "Changes not staged for commit" in multiversion_repo.run("git status", capture=True)
 
 
-def test_commit_no_changes_staged(multiversion_repo, context):
+def test_commit_no_changes_staged(multiversion_repo, git_context):
     path = multiversion_repo.workspace
     f = path / "hello.txt"
     f.write_text("hello world! v3")
 
     with pytest.raises(errors.VcsError) as e:
-        Git(context).commit("current_version", "new_version", "version_tag")
+        Git(git_context).commit("current_version", "new_version", "version_tag")
 
     assert "Changes not staged for commit" in str(e.value)
 
@@ -250,13 +411,13 @@ def test_commit_no_changes_staged(multiversion_repo, context):
 @pytest.mark.usefixtures("git_repo")
 def test_get_logs_empty_repo(context):
     with pytest.raises(errors.VcsError, match="No commit logs available."):
-        Git(context).get_logs(None)
+        vcs.new_vcs(context).get_logs(None)
 
 
 @pytest.mark.usefixtures("git_repo")
 def test_get_logs_unknown_revision(context):
     with pytest.raises(errors.VcsError, match="Unable to fetch commit logs."):
-        Git(context).get_logs("0.0.2")
+        vcs.new_vcs(context).get_logs("0.0.2")
 
 
 def test_get_logs(multiversion_repo, context):
@@ -282,7 +443,7 @@ Formatted
     )
     hash3 = str(multiversion_repo.api.head.commit)
 
-    logs = Git(context).get_logs("0.0.2")
+    logs = vcs.new_vcs(context).get_logs("0.0.2")
     assert logs == [
         [hash3[:7], hash3, "Commit message 3\n\nFormatted\n"],
         [hash2[:7], hash2, "commit log 2: electric boogaloo"],
@@ -290,10 +451,84 @@ Formatted
     ]
 
 
+@pytest.mark.usefixtures("git_repo")
+def test_iter_logs_empty_repo(context):
+    with pytest.raises(errors.VcsError, match="No commit logs available."):
+        list(vcs.new_vcs(context).iter_logs(None))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_logs(multiversion_repo, monkeypatch, git_context, chunk_size):
+    monkeypatch.setattr(vcs, "LOG_CHUNK_SIZE", chunk_size)
+    path = multiversion_repo.workspace
+    f = path / "hello.txt"
+    f.write_text("hello world! v3")
+    multiversion_repo.run("git add hello.txt")
+    multiversion_repo.api.index.commit("commit log")
+    hash1 = str(multiversion_repo.api.head.commit)
+
+    f.write_text("hello world! v4")
+    multiversion_repo.run("git add hello.txt")
+    multiversion_repo.api.index.commit(
+        """Commit message 2: electric boogaloo
+
+Formatted
+""",
+    )
+    hash2 = str(multiversion_repo.api.head.commit)
+
+    logs = Git(git_context).iter_logs("0.0.2")
+
+    assert next(logs) == (hash2[:7], hash2, "Commit message 2: electric boogaloo\n\nFormatted\n")
+    assert list(logs) == [(hash1[:7], hash1, "commit log")]
+
+
+def test_iter_logs_non_utf8_message(multiversion_repo, git_context):
+    # Write the commit object directly, `git commit` re-encodes invalid messages.
+    head = multiversion_repo.api.head.commit
+    commit = (
+        f"tree {head.tree.hexsha}\nparent {head.hexsha}\n"
+        "author n <n@example.com> 0 +0000\ncommitter n <n@example.com> 0 +0000\n\n"
+    ).encode() + b"fix: caf\xe9 latin1\n"
+    sha = (
+        subprocess.run(
+            ["git", "hash-object", "-t", "commit", "-w", "--stdin"],  # noqa: S607
+            input=commit,
+            capture_output=True,
+            check=True,
+        )
+        .stdout.decode()
+        .strip()
+    )
+    multiversion_repo.run(f"git update-ref HEAD {sha}")
+
+    assert list(Git(git_context).iter_logs("0.0.2")) == [(sha[:7], sha, "fix: caf\udce9 latin1\n")]
+
+
+@pytest.mark.usefixtures("multiversion_repo")
+def test_iter_logs_stopped_early_closes_process(monkeypatch, git_context):
+    processes = []
+    execute = git.cmd.Git.execute
+
+    def record(self, *args, **kwargs):
+        proc = execute(self, *args, **kwargs)
+        processes.append(proc)
+        return proc
+
+    monkeypatch.setattr(git.cmd.Git, "execute", record)
+    logs = Git(git_context).iter_logs(None)
+
+    next(logs)
+    logs.close()
+
+    assert processes[0].proc.poll() is not None
+    assert processes[0].proc.stdout.closed
+
+
 @pytest.mark.usefixtures("git_repo")
 def test_get_log_empty_repo(context):
     with pytest.raises(errors.VcsError, match="No commit log available."):
-        Git(context).get_log("hash")
+        vcs.new_vcs(context).get_log("hash")
 
 
 def test_get_log(multiversion_repo, context):
@@ -317,13 +552,13 @@ Formatted
 """,
     )
 
-    log = Git(context).get_log(hash2)
+    log = vcs.new_vcs(context).get_log(hash2)
     assert log == [hash2[:7], hash2, "commit log 2: electric boogaloo"]
 
 
 @pytest.mark.usefixtures("multiversion_repo")
 def test_get_logs_no_tag(context):
-    logs = Git(context).get_logs(None)
+    logs = vcs.new_vcs(context).get_logs(None)
     assert [log[2] for log in logs] == [
         "update",
         "initial commit",
@@ -340,7 +575,7 @@ def test_commit(multiversion_repo, context):
     f.write_text("hello world! v4")
     multiversion_repo.run("git add hello.txt")
 
-    Git(context).commit("0.0.2", "0.0.3", "v0.0.3")
+    vcs.new_vcs(context).commit("0.0.2", "0.0.3", "v0.0.3")
 
     assert multiversion_repo.api.head.commit.message == "Update CHANGELOG for 0.0.3\nBump version: 0.0.2 → 0.0.3\n"
     assert git.TagReference(multiversion_repo, path="refs/tags/v0.0.3") in multiversion_repo.api.refs
@@ -356,7 +591,7 @@ def test_commit_no_tag(multiversion_repo, context):
     f.write_text("hello world! v4")
     multiversion_repo.run("git add hello.txt")
 
-    Git(context, tag=False).commit("0.0.2", "0.0.3", "v0.0.3")
+    vcs.new_vcs(context, tag=False).commit("0.0.2", "0.0.3", "v0.0.3")
 
     assert multiversion_repo.api.head.commit.message == "Update CHANGELOG for 0.0.3\nBump version: 0.0.2 → 0.0.3\n"
     assert git.TagReference(multiversion_repo, path="refs/tags/v0.0.3") not in multiversion_repo.api.refs
@@ -373,15 +608,15 @@ def test_commit_reverts_on_tag_failure(multiversion_repo, context):
     multiversion_repo.run("git add hello.txt")
 
     with pytest.raises(errors.VcsError):
-        Git(context).commit("0.0.1", "0.0.2", "0.0.2")
+        vcs.new_vcs(context).commit("0.0.1", "0.0.2", "0.0.2")
 
     assert multiversion_repo.api.head.commit.message == "commit log"
 
 
 @pytest.mark.usefixtures("multiversion_repo")
-def test_commit_no_changes(context):
+def test_commit_no_changes(git_context):
     with pytest.raises(errors.VcsError) as ex:
-        Git(context).commit("0.0.2", "0.0.3", "v0.0.3")
+        Git(git_context).commit("0.0.2", "0.0.3", "v0.0.3")
 
     assert (
         str(ex.value)
@@ -405,7 +640,7 @@ def test_revert(multiversion_repo, context):
 
     assert multiversion_repo.api.head.commit.message == "commit log 2"
 
-    Git(context).revert()
+    vcs.new_vcs(context).revert()
 
     assert multiversion_repo.api.head.commit.message == "commit log"
 
@@ -423,6 +658,15 @@ def test_revert_dry_run(multiversion_repo, context):
 
     assert multiversion_repo.api.head.commit.message == "commit log 2"
 
-    Git(context, dry_run=True).revert()
+    vcs.new_vcs(context, dry_run=True).revert()
 
     assert multiversion_repo.api.head.commit.message == "commit log 2"
+
+
+@pytest.mark.usefixtures("multiversion_repo")
+def test_commit_no_changes_pygit2():
+    pytest.importorskip("pygit2")
+    context = Context(Config(current_version="0.0.0", vcs_backend="pygit2"))
+
+    with pytest.raises(errors.VcsError, match="Unable to commit: nothing to commit, working tree clean"):
+        vcs.new_vcs(context).commit("0.0.2", "0.0.3", "v0.0.3")
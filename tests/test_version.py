@@ -1,7 +1,14 @@
+import mmap
+import os
+from pathlib import Path
+from unittest import mock
+
 import pytest
 
-from changelog_gen import errors, version
+from changelog_gen import errors, util, version
 from changelog_gen.config import Config, read
+from changelog_gen.context import Context
+from changelog_gen.vcs import new_vcs
 
 
 @pytest.fixture
@@ -14,54 +21,346 @@ def config_factory():
     return factory
 
 
+def staged(path, contents, original):
+    return version.StagedFile(path, version._stage(path, contents), original)
+
+
 class TestModifyFile:
     def test_missing_file_raises(self, cwd):
         mf = version.ModifyFile("filename", cwd / "filename", [])
 
         with pytest.raises(errors.VersionError, match="Configured file not found 'filename'"):
-            mf.update("0.0.0", "0.0.1", dry_run=False)
+            mf.read()
 
-    def test_invalid_pattern_raises(self, cwd):
-        (cwd / "filename").write_text("0.0.0")
-        mf = version.ModifyFile("filename", cwd / "filename", ["{invalid}"])
+    def test_read_preserves_line_endings(self, cwd):
+        (cwd / "filename").write_bytes(b"0.0.0\r\n")
+        mf = version.ModifyFile("filename", cwd / "filename", [])
+
+        assert mf.read() == "0.0.0\r\n"
+
+    def test_invalid_pattern_raises(self):
+        mf = version.ModifyFile("filename", Path("filename"), ["{invalid}"])
 
         with pytest.raises(errors.VersionError, match="Incorrect pattern '{invalid}' for 'filename'."):
-            mf.update("0.0.0", "0.0.1", dry_run=False)
+            mf.update("0.0.0", "0.0.0", "0.0.1")
 
-    def test_nullop_pattern_raises(self, cwd):
-        (cwd / "filename").write_text("0.0.0")
-        mf = version.ModifyFile("filename", cwd / "filename", ["invalid"])
+    def test_nullop_pattern_raises(self):
+        mf = version.ModifyFile("filename", Path("filename"), ["invalid"])
 
         with pytest.raises(errors.VersionError, match="Pattern 'invalid' generated no change for 'filename'."):
-            mf.update("0.0.0", "0.0.1", dry_run=False)
+            mf.update("0.0.0", "0.0.0", "0.0.1")
 
-    def test_pattern_no_change_raises(self, cwd):
-        (cwd / "filename").write_text("0.0.0")
-        mf = version.ModifyFile("filename", cwd / "filename", ["version = {version}"])
+    def test_pattern_no_change_raises(self):
+        mf = version.ModifyFile("filename", Path("filename"), ["version = {version}"])
+
+        with pytest.raises(
+            errors.VersionError,
+            match="No change for 'filename', ensure pattern 'version = {version}' is correct.",
+        ):
+            mf.update("0.0.0", "0.0.0", "0.0.1")
+
+    def test_update_applies_multiple_updates(self):
+        mf = version.ModifyFile("filename", Path("filename"), ['version1 = "{version}"', 'version2 = "{version}'])
+
+        contents = mf.update('version1 = "0.0.0"\nversion2 = "0.0.0"', "0.0.0", "0.0.1")
+
+        assert contents == 'version1 = "0.0.1"\nversion2 = "0.0.1"'
+
+    def test_update_overlapping_patterns_prefer_longest(self):
+        mf = version.ModifyFile("filename", Path("filename"), ["{version}", 'version = "{version}"'])
+
+        contents = mf.update('version = "0.0.0"\nother = "0.0.0"', "0.0.0", "0.0.1")
+
+        assert contents == 'version = "0.0.1"\nother = "0.0.1"'
+
+    def test_update_does_not_substitute_replacements(self):
+        mf = version.ModifyFile("filename", Path("filename"), ["a{version}", "b{version}"])
+
+        # Single scan, the replacement for the first pattern isn't rematched by the second.
+        contents = mf.update("a1 b1", "1", "b1")
+
+        assert contents == "ab1 bb1"
+
+    def test_update_logs_pattern_hits(self, monkeypatch):
+        debug = mock.Mock()
+        monkeypatch.setattr(version.logger, "debug", debug)
+        mf = version.ModifyFile("filename", Path("filename"), ["v{version}", "{version}"])
+
+        mf.update("v0.0.0 0.0.0 0.0.0", "0.0.0", "0.0.1")
+
+        assert debug.call_args_list == [
+            mock.call("Pattern '%s' matched %d times in '%s'.", "v{version}", 1, "filename"),
+            mock.call("Pattern '%s' matched %d times in '%s'.", "{version}", 2, "filename"),
+        ]
+
+    def test_update_reports_unmatched_pattern(self):
+        mf = version.ModifyFile("filename", Path("filename"), ["{version}", "version = {version}"])
 
         with pytest.raises(
             errors.VersionError,
             match="No change for 'filename', ensure pattern 'version = {version}' is correct.",
         ):
-            mf.update("0.0.0", "0.0.1", dry_run=False)
+            mf.update("0.0.0", "0.0.0", "0.0.1")
+
+
+class TestTransaction:
+    def test_commit_replaces_files(self, cwd):
+        a, b = cwd / "a", cwd / "b"
+        a.write_text("a")
+        b.write_text("b")
+
+        transaction = version.Transaction()
+        transaction.add(staged(a, "new a", "a"))
+        transaction.add(staged(b, "new b", "b"))
+
+        assert a.read_text() == "a"
+        assert b.read_text() == "b"
+
+        transaction.commit()
+
+        assert a.read_text() == "new a"
+        assert b.read_text() == "new b"
+        assert sorted(p.name for p in cwd.iterdir()) == ["a", "b"]
+
+    def test_stage_syncs_contents(self, cwd, monkeypatch):
+        a = cwd / "a"
+        a.write_text("a")
+        fsync = mock.Mock(wraps=os.fsync)
+        monkeypatch.setattr(version.os, "fsync", fsync)
+
+        version._stage(a, "new a")
+
+        assert fsync.call_count == 1
+
+    def test_commit_preserves_permissions(self, cwd):
+        a = cwd / "a"
+        a.write_text("a")
+        a.chmod(0o755)
+
+        transaction = version.Transaction()
+        transaction.add(staged(a, "new a", "a"))
+        transaction.commit()
+
+        assert a.stat().st_mode & 0o777 == 0o755  # noqa: PLR2004
+
+    def test_commit_failure_rolls_back(self, cwd, monkeypatch):
+        a, b = cwd / "a", cwd / "b"
+        a.write_text("a")
+        b.write_text("b")
 
-    def test_update_applies_multiple_updates(self, cwd):
-        (cwd / "filename").write_text('version1 = "0.0.0"\nversion2 = "0.0.0"')
-        mf = version.ModifyFile("filename", cwd / "filename", ['version1 = "{version}"', 'version2 = "{version}'])
+        transaction = version.Transaction()
+        transaction.add(staged(a, "new a", "a"))
+        transaction.add(staged(b, "new b", "b"))
 
-        mf.update("0.0.0", "0.0.1", dry_run=False)
+        replace = Path.replace
 
-        assert (cwd / "filename.bak").read_text() == 'version1 = "0.0.1"\nversion2 = "0.0.1"'
+        def fail_b(self, target):
+            if Path(target) == b:
+                msg = "disk full"
+                raise OSError(msg)
+            return replace(self, target)
 
-    def test_update_writes_to_backup(self, cwd):
+        monkeypatch.setattr(Path, "replace", fail_b)
+
+        with pytest.raises(OSError, match="disk full"):
+            transaction.commit()
+
+        assert a.read_text() == "a"
+        assert b.read_text() == "b"
+        assert sorted(p.name for p in cwd.iterdir()) == ["a", "b"]
+
+    def test_discard_removes_staged_files(self, cwd):
+        a = cwd / "a"
+        a.write_text("a")
+
+        transaction = version.Transaction()
+        transaction.add(staged(a, "new a", "a"))
+        transaction.discard()
+
+        assert a.read_text() == "a"
+        assert [p.name for p in cwd.iterdir()] == ["a"]
+
+    def test_commit_rolls_back_patched_files(self, cwd, monkeypatch):
+        a, b = cwd / "a", cwd / "b"
+        a.write_bytes(b"version 0.0.0")
+        b.write_text("b")
+
+        transaction = version.Transaction()
+        transaction.add(version.PatchedFile(a, [version.Edit(8, b"0.0.0", b"0.0.1")]))
+        transaction.add(staged(b, "new b", "b"))
+
+        def fail(*_):
+            msg = "disk full"
+            raise OSError(msg)
+
+        monkeypatch.setattr(Path, "replace", fail)
+
+        with pytest.raises(OSError, match="disk full"):
+            transaction.commit()
+
+        assert a.read_bytes() == b"version 0.0.0"
+        assert b.read_text() == "b"
+
+
+class TestParallel:
+    @pytest.fixture
+    def files(self, cwd):
+        p = cwd / "pyproject.toml"
+        p.write_text(
+            "\n".join(
+                [
+                    "[tool.changelog_gen]",
+                    'current_version = "0.0.0"',
+                    "replace_workers = 4",
+                    "",
+                    *(f'[[tool.changelog_gen.files]]\nfilename = "file{i}.txt"\n' for i in range(20)),
+                ],
+            ),
+        )
+        for i in range(20):
+            (cwd / f"file{i}.txt").write_text(f"file{i} 0.0.0")
+        return p
+
+    def test_replace(self, cwd, files):
+        cfg = read(str(files))
+
+        modified = version.BumpVersion(cfg).replace("1.2.3")
+
+        assert modified == sorted(["pyproject.toml", *(f"file{i}.txt" for i in range(20))])
+        for i in range(20):
+            assert (cwd / f"file{i}.txt").read_text() == f"file{i} 1.2.3"
+        assert 'current_version = "1.2.3"' in files.read_text()
+
+    def test_replace_failure_changes_nothing(self, cwd, files):
+        (cwd / "file7.txt").write_text("file7")
+        (cwd / "file13.txt").unlink()
+        content = files.read_text()
+        cfg = read(str(files))
+
+        with pytest.raises(errors.VersionError, match="No change for 'file7.txt'"):
+            version.BumpVersion(cfg).replace("1.2.3")
+
+        assert files.read_text() == content
+        for i in set(range(20)) - {7, 13}:
+            assert (cwd / f"file{i}.txt").read_text() == f"file{i} 0.0.0"
+        assert len(list(cwd.iterdir())) == 20  # noqa: PLR2004
+
+    def test_replace_dry_run(self, cwd, files):
+        content = files.read_text()
+        cfg = read(str(files))
+
+        version.BumpVersion(cfg, dry_run=True).replace("1.2.3")
+
+        assert files.read_text() == content
+        for i in range(20):
+            assert (cwd / f"file{i}.txt").read_text() == f"file{i} 0.0.0"
+
+    def test_replace_profiles_files(self, files, monkeypatch):
+        profiler = util.Profiler()
+        monkeypatch.setattr(util, "_profiler", profiler)
+        cfg = read(str(files))
+
+        version.BumpVersion(cfg).replace("1.2.3")
+
+        assert sorted(span.name for span in profiler.spans) == sorted(
+            f"changelog_gen.version.ModifyFile.stage[{name}]"
+            for name in ["pyproject.toml", *(f"file{i}.txt" for i in range(20))]
+        )
+
+
+class TestLargeFile:
+    @pytest.fixture(autouse=True)
+    def _threshold(self, monkeypatch):
+        monkeypatch.setattr(version, "MMAP_THRESHOLD", 1)
+
+    def test_find_matches_update(self, cwd):
+        contents = 'version = "0.0.0"\nother = "0.0.0"\n'
+        (cwd / "filename").write_text(contents)
+        mf = version.ModifyFile("filename", cwd / "filename", ["{version}", 'version = "{version}"'])
+
+        with (cwd / "filename").open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            edits = mf.find(mm, "0.0.0", "0.0.10")
+
+        assert edits == [
+            version.Edit(0, b'version = "0.0.0"', b'version = "0.0.10"'),
+            version.Edit(27, b"0.0.0", b"0.0.10"),
+        ]
+
+    def test_find_reports_unmatched_pattern(self, cwd):
         (cwd / "filename").write_text("0.0.0")
-        mf = version.ModifyFile("filename", cwd / "filename", ["{version}"])
+        mf = version.ModifyFile("filename", cwd / "filename", ["{version}", "version = {version}"])
+
+        with (cwd / "filename").open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:  # noqa: SIM117
+            with pytest.raises(
+                errors.VersionError,
+                match="No change for 'filename', ensure pattern 'version = {version}' is correct.",
+            ):
+                mf.find(mm, "0.0.0", "0.0.1")
+
+    def test_equal_length_patched_in_place(self, cwd):
+        p = cwd / "filename"
+        p.write_bytes(b"a 0.0.0\r\n" * 1000)
+        inode = p.stat().st_ino
+        mf = version.ModifyFile("filename", p, ["{version}"])
+
+        change = mf.stage("0.0.0", "0.0.1", dry_run=False)
+        assert isinstance(change, version.PatchedFile)
+        change.commit()
+
+        assert p.read_bytes() == b"a 0.0.1\r\n" * 1000
+        assert p.stat().st_ino == inode
+        assert [f.name for f in cwd.iterdir()] == ["filename"]
+
+    def test_length_change_rewritten(self, cwd):
+        p = cwd / "filename"
+        p.write_bytes(b"a 0.0.9\n" * 1000)
+        mf = version.ModifyFile("filename", p, ["{version}"])
 
-        original, backup = mf.update("0.0.0", "0.0.1", dry_run=False)
+        change = mf.stage("0.0.9", "0.0.10", dry_run=False)
+        assert isinstance(change, version.RewrittenFile)
+        change.commit()
 
-        assert (cwd / "filename").read_text() == "0.0.0"
-        assert original.read_text() == "0.0.0"
-        assert backup.read_text() == "0.0.1"
+        assert p.read_bytes() == b"a 0.0.10\n" * 1000
+
+    def test_rewritten_rollback(self, cwd):
+        p = cwd / "filename"
+        p.write_bytes(b"a 0.0.9 b 0.0.9 c")
+        mf = version.ModifyFile("filename", p, ["{version}"])
+
+        change = mf.stage("0.0.9", "0.0.10", dry_run=False)
+        change.commit()
+        change.rollback()
+
+        assert p.read_bytes() == b"a 0.0.9 b 0.0.9 c"
+        assert [f.name for f in cwd.iterdir()] == ["filename"]
+
+    def test_dry_run_stages_nothing(self, cwd):
+        p = cwd / "filename"
+        p.write_bytes(b"a 0.0.9")
+        mf = version.ModifyFile("filename", p, ["{version}"])
+
+        assert mf.stage("0.0.9", "0.0.10", dry_run=True) is None
+        assert p.read_bytes() == b"a 0.0.9"
+        assert [f.name for f in cwd.iterdir()] == ["filename"]
+
+    def test_replace(self, cwd):
+        p = cwd / "pyproject.toml"
+        p.write_text(
+            """
+[tool.changelog_gen]
+current_version = "0.0.0"
+
+[[tool.changelog_gen.files]]
+filename = "README.md"
+        """.strip(),
+        )
+        (cwd / "README.md").write_text("Hello 0.0.0")
+        cfg = read(str(p))
+
+        version.BumpVersion(cfg).replace("1.2.3")
+
+        assert (cwd / "README.md").read_text() == "Hello 1.2.3"
+        assert 'current_version = "1.2.3"' in p.read_text()
 
 
 class TestInHouse:
@@ -275,3 +574,115 @@ filename = "nested/README.md"
         new = "1.2.3"
         files = version.BumpVersion(cfg).replace(new)
         assert files == ["nested/README.md", "pyproject.toml"]
+
+    def test_replace_preserves_line_endings(self, cwd):
+        p = cwd / "pyproject.toml"
+        p.write_bytes(b'[tool.changelog_gen]\r\ncurrent_version = "0.0.0"\r\n')
+        cfg = read(str(p))
+
+        version.BumpVersion(cfg).replace("1.2.3")
+
+        assert p.read_bytes() == b'[tool.changelog_gen]\r\ncurrent_version = "1.2.3"\r\n'
+
+    def test_replace_leaves_no_staged_files(self, cwd):
+        content = """
+[tool.changelog_gen]
+current_version = "0.0.0"
+
+[[tool.changelog_gen.files]]
+filename = "README.md"
+pattern = "{invalid}"
+        """.strip()
+        (cwd / "README.md").write_text("0.0.0")
+        p = cwd / "pyproject.toml"
+        p.write_text(content)
+        cfg = read(str(p))
+
+        with pytest.raises(errors.VersionError):
+            version.BumpVersion(cfg).replace("1.2.3")
+
+        assert sorted(p.name for p in cwd.iterdir()) == ["README.md", "pyproject.toml"]
+
+    def test_replace_expands_globs(self, git_repo):
+        path = git_repo.workspace
+        p = path / "pyproject.toml"
+        p.write_text(
+            """
+[tool.changelog_gen]
+current_version = "0.0.0"
+
+[[tool.changelog_gen.files]]
+filename = "charts/**/Chart.yaml"
+pattern = "version: {version}"
+exclude = "charts/legacy/*"
+        """.strip(),
+        )
+        for chart in ["a", "b/c", "legacy", "ignored"]:
+            (path / "charts" / chart).mkdir(parents=True)
+            (path / "charts" / chart / "Chart.yaml").write_text("version: 0.0.0")
+        (path / ".gitignore").write_text("charts/ignored\n")
+        git_repo.run("git add .")
+        cfg = read(str(p))
+        git = new_vcs(Context(cfg))
+
+        files = version.BumpVersion(cfg, git=git).replace("1.2.3")
+
+        assert files == ["charts/a/Chart.yaml", "charts/b/c/Chart.yaml", "pyproject.toml"]
+        assert (path / "charts/a/Chart.yaml").read_text() == "version: 1.2.3"
+        assert (path / "charts/b/c/Chart.yaml").read_text() == "version: 1.2.3"
+        assert (path / "charts/legacy/Chart.yaml").read_text() == "version: 0.0.0"
+        assert (path / "charts/ignored/Chart.yaml").read_text() == "version: 0.0.0"
+
+    def test_replace_directory_skips_files_without_version(self, git_repo):
+        path = git_repo.workspace
+        p = path / "pyproject.toml"
+        p.write_text(
+            """
+[tool.changelog_gen]
+current_version = "0.0.0"
+
+[[tool.changelog_gen.files]]
+filename = "charts"
+        """.strip(),
+        )
+        (path / "charts").mkdir()
+        (path / "charts/Chart.yaml").write_text("version: 0.0.0")
+        (path / "charts/README.md").write_text("# Charts")
+        git_repo.run("git add .")
+        cfg = read(str(p))
+        git = new_vcs(Context(cfg))
+
+        files = version.BumpVersion(cfg, git=git).replace("1.2.3")
+
+        assert files == ["charts/Chart.yaml", "pyproject.toml"]
+        assert (path / "charts/Chart.yaml").read_text() == "version: 1.2.3"
+        assert (path / "charts/README.md").read_text() == "# Charts"
+
+    def test_replace_directory_without_version_raises(self, git_repo):
+        path = git_repo.workspace
+        p = path / "pyproject.toml"
+        p.write_text(
+            """
+[tool.changelog_gen]
+current_version = "0.0.0"
+
+[[tool.changelog_gen.files]]
+filename = "charts"
+pattern = "version: {version}"
+        """.strip(),
+        )
+        (path / "charts").mkdir()
+        (path / "charts/Chart.yaml").write_text("appVersion: 0.0.0")
+        (path / "charts/README.md").write_text("# Charts")
+        git_repo.run("git add .")
+        cfg = read(str(p))
+        git = new_vcs(Context(cfg))
+
+        with pytest.raises(
+            errors.VersionError,
+            match="No change for 'charts', ensure pattern 'version: {version}' is correct.",
+        ):
+            version.BumpVersion(cfg, git=git).replace("1.2.3")
+
+        assert p.read_text().startswith('[tool.changelog_gen]\ncurrent_version = "0.0.0"')
+        assert (path / "charts/Chart.yaml").read_text() == "appVersion: 0.0.0"
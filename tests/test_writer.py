@@ -1,4 +1,10 @@
+import hashlib
+import io
+import os
 import pathlib
+import shutil
+import subprocess
+import tracemalloc
 from unittest import mock
 
 import pytest
@@ -51,6 +57,65 @@ def test_new_writer_raises_for_unsupported_extension(ctx):
         writer.new_writer(ctx, mock.Mock(value="txt"))
 
 
+def test_compile_template_cached():
+    template = writer.compile_template("- {{ change.description | regex_replace('i.*e', 'ove it') }}")
+
+    assert writer.compile_template("- {{ change.description | regex_replace('i.*e', 'ove it') }}") is template
+    assert template.render(change=Change("header", "line", "fix")) == "- love it"
+
+
+def test_consume_compiles_templates_once(changelog_md, ctx, monkeypatch):
+    from_string = mock.Mock(wraps=writer._environment().from_string)
+    monkeypatch.setattr(writer._environment(), "from_string", from_string)
+    writer.compile_template.cache_clear()
+    w = writer.MdWriter(changelog_md, ctx)
+
+    w.consume(
+        "## v0.0.1",
+        {"fix": "Bug fixes"},
+        [Change("Bug fixes", f"line{i}", "fix") for i in range(10)],
+    )
+
+    assert from_string.call_count == 2  # change and release templates  # noqa: PLR2004
+
+
+@pytest.mark.skipif(shutil.which("patch") is None, reason="patch is not installed")
+@pytest.mark.parametrize(
+    ("writer_cls", "existing"),
+    [
+        (writer.MdWriter, ""),
+        (writer.MdWriter, "# Changelog\n"),
+        (writer.MdWriter, "# Changelog\n\n" + "".join(f"## 0.0.{i}\n\n- line{i}\n\n" for i in range(1, 6))),
+        (writer.RstWriter, ""),
+        (writer.RstWriter, "=========\nChangelog\n=========\n\n0.0.1\n=====\n\n.. _`#1`: http://url/issues/1"),
+        (
+            writer.RstWriter,
+            "=========\nChangelog\n=========\n\n"
+            + "".join(f"0.0.{i}\n=====\n\n* line{i}\n\n" for i in range(1, 6))
+            + ".. _`#1`: http://url/issues/1\n",
+        ),
+    ],
+)
+def test_diff_applies_to_written_changelog(tmp_path, ctx, writer_cls, existing):
+    changelog = tmp_path / f"CHANGELOG.{writer_cls.extension.value}"
+    if existing:
+        changelog.write_text(existing)
+    w = writer_cls(changelog, ctx)
+    w.consume(
+        "0.0.6",
+        {"header": "header"},
+        [Change("header", "line6", "fix", links=[Link("#6", "http://url/issues/6")])],
+    )
+    diff = w.diff([w.file_header, *w.content])
+    patched = tmp_path / "patched"
+    patched.write_text(existing)
+
+    subprocess.run(["patch", str(patched)], input=f"{diff}\n".encode(), check=True, capture_output=True)  # noqa: S603, S607
+    w.write()
+
+    assert patched.read_bytes() == changelog.read_bytes()
+
+
 class TestBaseWriter:
     def test_init(self, changelog, ctx):
         w = writer.BaseWriter(changelog, ctx)
@@ -64,12 +129,14 @@ class TestBaseWriter:
         assert w.content == []
         assert w.dry_run is True
 
-    def test_init_no_existing_entries(self, changelog, ctx):
+    def test_stream_no_existing_entries(self, changelog, ctx):
         w = writer.BaseWriter(changelog, ctx)
+        output = io.BytesIO()
 
-        assert w.existing == []
+        assert w._stream(output, ["new"]) is None
+        assert output.getvalue() == b"new"
 
-    def test_init_stores_existing_changelog(self, changelog, ctx):
+    def test_stream_copies_existing_changelog(self, changelog, ctx):
         changelog.write_text(
             """
 ## 0.0.1
@@ -83,16 +150,10 @@ class TestBaseWriter:
         )
         w = writer.BaseWriter(changelog, ctx)
 
-        assert w.existing == [
-            "## 0.0.1",
-            "",
-            "### header",
-            "",
-            "- line1",
-            "- line2",
-            "- line3",
-            "",
-        ]
+        output = io.BytesIO()
+        w._stream(output, ["new"])
+
+        assert output.getvalue().decode() == "new\n## 0.0.1\n\n### header\n\n- line1\n- line2\n- line3\n"
 
     def test_content_as_str(self, changelog, ctx):
         w = writer.BaseWriter(changelog, ctx)
@@ -109,8 +170,7 @@ class TestBaseWriter:
     def test_consume(self, monkeypatch, changelog, ctx):
         monkeypatch.setattr(writer.BaseWriter, "_consume", mock.Mock())
 
-        w = writer.BaseWriter(changelog, ctx)
-        w._change_template = ""
+        w = writer.BaseWriter(changelog, ctx, change_template="{{ '' }}")
 
         w.consume(
             "0.0.1",
@@ -146,8 +206,7 @@ class TestBaseWriter:
     def test_consume_sorting(self, monkeypatch, changelog, ctx):
         monkeypatch.setattr(writer.BaseWriter, "_consume", mock.Mock())
 
-        w = writer.BaseWriter(changelog, ctx)
-        w._change_template = ""
+        w = writer.BaseWriter(changelog, ctx, change_template="{{ '' }}")
 
         w.consume(
             "0.0.1",
@@ -194,12 +253,14 @@ class TestMdWriter:
         assert w.content == []
         assert w.dry_run is True
 
-    def test_init_no_existing_entries(self, changelog_md, ctx):
+    def test_stream_no_existing_entries(self, changelog_md, ctx):
         w = writer.MdWriter(changelog_md, ctx)
+        output = io.BytesIO()
 
-        assert w.existing == []
+        assert w._stream(output, ["new"]) is None
+        assert output.getvalue() == b"new"
 
-    def test_init_stores_existing_changelog(self, changelog_md, ctx):
+    def test_stream_copies_existing_changelog(self, changelog_md, ctx):
         changelog_md.write_text(
             """# Changelog
 
@@ -215,16 +276,10 @@ class TestMdWriter:
 
         w = writer.MdWriter(changelog_md, ctx)
 
-        assert w.existing == [
-            "## 0.0.1",
-            "",
-            "### header",
-            "",
-            "- line1",
-            "- line2",
-            "- line3",
-            "",
-        ]
+        output = io.BytesIO()
+        w._stream(output, ["new"])
+
+        assert output.getvalue().decode() == "new\n## 0.0.1\n\n### header\n\n- line1\n- line2\n- line3\n"
 
     def test_render_change(self, changelog_md, ctx):
         w = writer.MdWriter(changelog_md, ctx)
@@ -234,8 +289,11 @@ class TestMdWriter:
         assert line == "- line"
 
     def test_render_change_custom_filter(self, changelog_md, ctx):
-        w = writer.MdWriter(changelog_md, ctx)
-        w._change_template = "- {{ change.description | regex_replace('i.*e', 'ove it')}}"  # pragma: no-spell-check
+        w = writer.MdWriter(
+            changelog_md,
+            ctx,
+            change_template="- {{ change.description | regex_replace('i.*e', 'ove it')}}",  # pragma: no-spell-check
+        )
 
         line = w._render_change(Change("header", "line", "fix", footers=[Footer("Refs", ": ", "#1")]))
 
@@ -356,6 +414,189 @@ class TestMdWriter:
 """
         )
 
+    def test_write_preserves_existing_bytes(self, changelog_md, ctx):
+        existing = "## 0.0.1\r\n\n- línea1\n- line2"
+        changelog_md.write_bytes(f"# Changelog\n\n{existing}".encode())
+
+        w = writer.MdWriter(changelog_md, ctx)
+        w.content = ["## 0.0.2", "", "- line3", ""]
+        w.write()
+
+        assert changelog_md.read_bytes() == f"# Changelog\n\n## 0.0.2\n\n- line3\n\n{existing}".encode()
+
+    def test_write_preserves_permissions(self, changelog_md, ctx):
+        changelog_md.chmod(0o640)
+
+        w = writer.MdWriter(changelog_md, ctx)
+        w.content = ["## 0.0.1", ""]
+        w.write()
+
+        assert changelog_md.stat().st_mode & 0o777 == 0o640  # noqa: PLR2004
+
+    def test_write_new_changelog_uses_umask(self, cwd, ctx):
+        changelog = cwd / "CHANGELOG.md"
+        umask = os.umask(0o022)
+        try:
+            w = writer.MdWriter(changelog, ctx)
+            w.content = ["## 0.0.1", ""]
+            w.write()
+        finally:
+            os.umask(umask)
+
+        assert changelog.stat().st_mode & 0o777 == 0o644  # noqa: PLR2004
+
+    def test_write_follows_symlink(self, cwd, changelog_md, ctx):
+        link = cwd / "CHANGES.md"
+        link.symlink_to(changelog_md.name)
+
+        w = writer.MdWriter(link, ctx)
+        w.content = ["## 0.0.1", ""]
+        w.write()
+
+        assert link.is_symlink()
+        assert "## 0.0.1" in changelog_md.read_text()
+
+    def test_write_failure_leaves_changelog(self, monkeypatch, changelog_md, ctx):
+        changelog_md.write_text("# Changelog\n\n## 0.0.1\n")
+        monkeypatch.setattr(writer.shutil, "copyfileobj", mock.Mock(side_effect=OSError))
+
+        w = writer.MdWriter(changelog_md, ctx)
+        w.content = ["## 0.0.2", ""]
+        with pytest.raises(OSError):  # noqa: PT011
+            w.write()
+
+        assert changelog_md.read_text() == "# Changelog\n\n## 0.0.1\n"
+        assert list(changelog_md.parent.glob(".CHANGELOG.md.*")) == []
+
+    def test_write_memory_constant(self, monkeypatch, changelog_md, ctx):
+        monkeypatch.setattr(writer, "COPY_CHUNK_SIZE", 64 * 1024)
+        release = "## 0.0.1\n\n### Bug fixes\n\n" + "- fix a bug [[#1](http://url/issues/1)]\n" * 5000 + "\n"
+        changelog_md.write_text("# Changelog\n\n" + release * 50)  # ~10MB
+        size = changelog_md.stat().st_size
+
+        w = writer.MdWriter(changelog_md, ctx)
+        w.content = ["## 0.0.2", ""]
+        w.sections()  # index existing releases
+        tracemalloc.start()
+        try:
+            w.write()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert changelog_md.stat().st_size == size + len("## 0.0.2\n\n")
+        # Previously the existing changelog was held in memory several times over while writing.
+        assert peak < 1024 * 1024
+
+    def test_changelog_not_read_until_written(self, monkeypatch, changelog_md, ctx):
+        changelog_md.write_text("# Changelog\n\n## 0.0.1\n")
+        open_ = mock.create_autospec(pathlib.Path.open, side_effect=pathlib.Path.open)
+        monkeypatch.setattr(pathlib.Path, "open", open_)
+
+        w = writer.MdWriter(changelog_md, ctx, dry_run=True)
+        w.consume("0.0.2", {"header": "header"}, [Change("header", "line1", "fix")])
+        assert open_.call_count == 0
+
+        w.write()
+        assert open_.call_count == 1
+
+    def test_write_dry_run_validates(self, changelog_md, ctx):
+        changelog_md.write_text("# Changelog\n\n## 0.0.1\n\n- line1\n")
+
+        w = writer.MdWriter(changelog_md, ctx, dry_run=True)
+        w.content = ["## 0.0.2", "", "- line2", ""]
+        validation = writer._Validation()
+        with mock.patch.object(writer, "_Validation", return_value=validation):
+            w.write()
+
+        expected = b"# Changelog\n\n## 0.0.2\n\n- line2\n\n## 0.0.1\n\n- line1\n"
+        assert changelog_md.read_bytes() == b"# Changelog\n\n## 0.0.1\n\n- line1\n"
+        assert validation.size == len(expected)
+        assert validation.hexdigest() == hashlib.sha256(expected).hexdigest()
+
+    def test_write_dry_run_diff(self, changelog_md):
+        changelog_md.write_text("# Changelog\n\n## 0.0.1\n\n- line1\n- line2\n- line3\n- line4\n")
+        ctx = mock.Mock()
+
+        w = writer.MdWriter(changelog_md, ctx, dry_run=True, show_diff=True)
+        w.content = ["## 0.0.2", "", "- line5", ""]
+        w.write()
+
+        assert ctx.error.call_args == mock.call(
+            """--- a/CHANGELOG.md
++++ b/CHANGELOG.md
+@@ -1,4 +1,8 @@
+ # Changelog
++
++## 0.0.2
++
++- line5
+\x20
+ ## 0.0.1
+\x20""",
+        )
+
+    def test_diff_new_changelog(self, tmp_path, ctx):
+        w = writer.MdWriter(tmp_path / "CHANGELOG.md", ctx)
+
+        assert (
+            w.diff([w.file_header])
+            == """--- a/CHANGELOG.md
++++ b/CHANGELOG.md
+@@ -0,0 +1 @@
++# Changelog"""
+        )
+
+    def test_sections(self, changelog_md, ctx):
+        changelog_md.write_text("# Changelog\n\n## v0.0.2 - 2024-03-08\n\n- line2\n\n## v0.0.1\n\n- line1\n")
+
+        w = writer.MdWriter(changelog_md, ctx)
+
+        assert w.sections() == [
+            {"version": "v0.0.2", "title": "v0.0.2 - 2024-03-08", "offset": 13, "length": 33, "commits": []},
+            {"version": "v0.0.1", "title": "v0.0.1", "offset": 46, "length": 19, "commits": []},
+        ]
+        assert w.show("v0.0.2") == "## v0.0.2 - 2024-03-08\n\n- line2\n\n"
+        assert w.show("0.0.1", ["v0.0.1"]) == "## v0.0.1\n\n- line1\n"
+        assert w.show("0.0.3") is None
+
+    def test_sections_no_changelog(self, tmp_path, ctx):
+        w = writer.MdWriter(tmp_path / "CHANGELOG.md", ctx)
+
+        assert w.sections() == []
+        assert not w.index_path.exists()
+
+    def test_write_updates_index(self, monkeypatch, changelog_md, ctx):
+        changelog_md.write_text("# Changelog\n\n## v0.0.1\n\n- line1\n")
+        w = writer.MdWriter(changelog_md, ctx)
+        w.sections()
+
+        monkeypatch.setattr(w, "_rebuild_index", mock.Mock())
+        w.consume("v0.0.2", {"header": "header"}, [Change("header", "line2", "fix", commit_hash="hash2")])
+        w.write()
+
+        assert w._rebuild_index.call_count == 0
+        sections = w.sections()
+        assert [(s["version"], s["commits"]) for s in sections] == [("v0.0.2", ["hash2"]), ("v0.0.1", [])]
+        assert w.show("v0.0.1") == "## v0.0.1\n\n- line1\n"
+        assert w.show("v0.0.2") == "## v0.0.2\n\n### header\n\n- line2\n\n"
+
+        # Incremental index matches a full rebuild.
+        monkeypatch.undo()
+        w.index_path.unlink()
+        assert [{**s, "commits": []} for s in w.sections()] == [{**s, "commits": []} for s in sections]
+
+    def test_stale_index_rebuilt(self, changelog_md, ctx):
+        changelog_md.write_text("# Changelog\n\n## v0.0.1\n\n- line1\n")
+        w = writer.MdWriter(changelog_md, ctx)
+        w.consume("v0.0.2", {"header": "header"}, [Change("header", "line2", "fix", commit_hash="hash2")])
+        w.write()
+
+        changelog_md.write_text(changelog_md.read_text().replace("- line2", "- line2 edited by hand"))
+
+        assert w.show("v0.0.2") == "## v0.0.2\n\n### header\n\n- line2 edited by hand\n\n"
+        assert w.sections()[0]["commits"] == ["hash2"]
+
 
 class TestRstWriter:
     def test_init(self, changelog_rst, ctx):
@@ -370,12 +611,14 @@ class TestRstWriter:
         assert w.content == []
         assert w.dry_run is True
 
-    def test_init_no_existing_entries(self, changelog_rst, ctx):
+    def test_stream_no_existing_entries(self, changelog_rst, ctx):
         w = writer.RstWriter(changelog_rst, ctx)
+        output = io.BytesIO()
 
-        assert w.existing == []
+        assert w._stream(output, ["new"]) is None
+        assert output.getvalue() == b"new"
 
-    def test_init_stores_existing_changelog(self, changelog_rst, ctx):
+    def test_stream_copies_existing_changelog(self, changelog_rst, ctx):
         changelog_rst.write_text(
             """=========
 Changelog
@@ -397,20 +640,10 @@ header
 
         w = writer.RstWriter(changelog_rst, ctx)
 
-        assert w.existing == [
-            "0.0.1",
-            "=====",
-            "",
-            "header",
-            "------",
-            "",
-            "* line1",
-            "",
-            "* line2",
-            "",
-            "* line3",
-            "",
-        ]
+        output = io.BytesIO()
+        w._stream(output, ["new"])
+
+        assert output.getvalue().decode() == "new\n0.0.1\n=====\n\nheader\n------\n\n* line1\n\n* line2\n\n* line3\n"
 
     def test_render_change(self, changelog_rst, ctx):
         w = writer.RstWriter(changelog_rst, ctx)
@@ -546,6 +779,61 @@ header
 """
         )
 
+    def test_diff_includes_links(self, changelog_rst, ctx):
+        changelog_rst.write_text("=========\nChangelog\n=========\n\n0.0.1\n=====\n\n.. _`#1`: http://url/issues/1")
+
+        w = writer.RstWriter(changelog_rst, ctx)
+        w.consume(
+            "0.0.2",
+            {"header": "header"},
+            [Change("header", "line2", "fix", links=[Link("#2", "http://url/issues/2")])],
+        )
+        content = [w.file_header, *w.content]
+
+        assert (
+            w.diff(content)
+            == """--- a/CHANGELOG.rst
++++ b/CHANGELOG.rst
+@@ -2,7 +2,16 @@
+ Changelog
+ =========
+\x20
++0.0.2
++=====
++
++header
++------
++
++* line2 [`#2`_]
++
+ 0.0.1
+ =====
+\x20
+-.. _`#1`: http://url/issues/1
+\\ No newline at end of file
++.. _`#1`: http://url/issues/1
++.. _`#2`: http://url/issues/2
+\\ No newline at end of file"""
+        )
+
+        w.write()
+        lines = changelog_rst.read_text().split("\n")
+        assert lines[16:] == [".. _`#2`: http://url/issues/2"]
+        assert len(lines) == 17  # noqa: PLR2004
+
+    def test_sections(self, changelog_rst, ctx):
+        changelog_rst.write_text(
+            "=========\nChangelog\n=========\n\nv0.0.2\n======\n\n* line2\n\nv0.0.1\n======\n\n* line1\n",
+        )
+
+        w = writer.RstWriter(changelog_rst, ctx)
+
+        assert [(s["version"], s["offset"], s["length"]) for s in w.sections()] == [
+            ("v0.0.2", 31, 24),
+            ("v0.0.1", 55, 23),
+        ]
+        assert w.show("v0.0.1") == "v0.0.1\n======\n\n* line1\n"
+
     def test_write_with_existing_content(self, changelog_rst):
         changelog_rst.write_text(
             """=========